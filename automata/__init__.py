@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Finite automata: DFAs, NFAs, Mealy and Moore machines and the dataset
+tools built on them.
+
+The names below are imported from their submodules on first use, so
+``import automata`` stays cheap; NumPy is only loaded by sampling,
+counting, the batch helpers and the dataset tools, and pydot only by
+DFA.to_dot.
+"""
+import importlib
+
+_EXPORTS = {
+    'DFA': 'dfa',
+    'DFAState': 'dfa',
+    'MealyMachine': 'dfa',
+    'MealyState': 'dfa',
+    'MooreState': 'dfa',
+    'NFA': 'nfa',
+    'LazyDFA': 'nfa',
+    'compile_regex': 'regexp',
+    'CompiledDFA': 'compiled',
+    'CompiledMealy': 'compiled',
+    'LazyProduct': 'product',
+    'Profile': 'profiling',
+    'Trace': 'tracing',
+    'RingTrace': 'tracing',
+    'PrintTrace': 'tracing',
+    'CSRGraph': 'dataset',
+    'FacebookIPR': 'dataset',
+    'load_edges': 'dataset',
+    'genuine_mask': 'dataset',
+    'classify_dataset': 'dataset',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError('module {0!r} has no attribute {1!r}'
+                             .format(__name__, name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+import io
+import mmap
+import os
+from array import array
+
+
+class CompiledDFA(object):
+    def __init__(self, alphabet, names, table, accept, initial,
+                 symbol_index=None):
+        """Frozen DFA as a flat state x symbol table.
+
+        Rows are addressed by offset (state index times number of columns)
+        so the walk in `accepts` is one dict lookup and one array index per
+        symbol. The last row is the reserved reject (sink) state. Columns
+        are one per symbol unless `symbol_index` maps several symbols to the
+        same column (see `compress`).
+        """
+        self.alphabet = list(alphabet)
+        if symbol_index is None:
+            symbol_index = {s: i for i, s in enumerate(self.alphabet)}
+        self.symbol_index = symbol_index
+        self.names = names
+        self.n_symbols = len(set(symbol_index.values()))
+        self.n_states = len(self.names)
+        self.sink = self.n_states
+        self.table = table
+        self.accept = accept
+        self.initial = initial
+        self._np_table = None
+        self._bytes = None
+
+    def __repr__(self):
+        return ('{0}(states={1}, symbols={2})'
+                .format(self.__class__.__name__, self.n_states,
+                        self.n_symbols))
+
+    def next_state(self, state, symbol):
+        return self.table[state * self.n_symbols
+                          + self.symbol_index[symbol]] // self.n_symbols
+
+    def accepts(self, sequence):
+        table = self.table
+        cols = self.symbol_index
+        sink = self.sink * self.n_symbols
+        cur = self.initial * self.n_symbols
+        try:
+            for s in sequence:
+                cur = table[cur + cols[s]]
+                if cur == sink:
+                    return False
+        except KeyError:
+            raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                             .format(s, self.__class__.__name__))
+        return self.accept[cur // self.n_symbols] == 1
+
+    def symbol_classes(self):
+        """Partition the alphabet into symbols no state tells apart.
+
+        Two symbols share a class when every state, the sink included, moves
+        to the same state on both. Classes keep alphabet order.
+        """
+        k = self.n_symbols
+        table = self.table
+        rows = range(self.n_states + 1)
+        by_column = {}
+        for s in self.alphabet:
+            c = self.symbol_index[s]
+            column = tuple([table[q * k + c] for q in rows])
+            by_column.setdefault(column, []).append(s)
+        return list(by_column.values())
+
+    def compress(self):
+        """Equivalent table with one column per symbol class."""
+        k = self.n_symbols
+        classes = self.symbol_classes()
+        if len(classes) == k:
+            return self
+        m = len(classes)
+        columns = [self.symbol_index[cl[0]] for cl in classes]
+        table = array('l', [0]) * ((self.n_states + 1) * m)
+        for q in range(self.n_states + 1):
+            for j, c in enumerate(columns):
+                table[q * m + j] = self.table[q * k + c] // k * m
+        symbol_index = {s: j for j, cl in enumerate(classes) for s in cl}
+        return self._with_columns(table, columns, symbol_index)
+
+    def _with_columns(self, table, columns, symbol_index):
+        """Copy of this table keeping only `columns`, already gathered
+        into `table`."""
+        return CompiledDFA(self.alphabet, self.names, table, self.accept,
+                           self.initial, symbol_index=symbol_index)
+
+    def stream(self):
+        return StreamMatcher(self)
+
+    def bytes_scanner(self):
+        if self._bytes is None:
+            self._bytes = ByteScanner(self)
+        return self._bytes
+
+    def numpy_table(self):
+        """Transition table as a (states + 1) x symbols NumPy array."""
+        import numpy as np
+        if self._np_table is None:
+            table = np.array(self.table, dtype=np.intp) // self.n_symbols
+            self._np_table = table.reshape(self.n_states + 1, self.n_symbols)
+        return self._np_table
+
+    def encode_batch(self, sequences):
+        """Encode sequences as a padded symbol-index matrix plus lengths.
+
+        The matrix has one row per sequence and is stored column-major, so
+        each column (one symbol position across the batch) is contiguous.
+        """
+        import numpy as np
+        sequences = list(sequences)
+        lengths = np.fromiter((len(s) for s in sequences), dtype=np.intp,
+                              count=len(sequences))
+        width = int(lengths.max()) if len(sequences) else 0
+        dtype = np.uint8 if self.n_symbols <= 256 else np.int32
+        codes = np.zeros((width, len(sequences)), dtype=dtype)
+        if width == 0:
+            return codes.T, lengths
+        if (all(isinstance(s, str) and len(s) == 1 for s in self.alphabet)
+                and all(isinstance(s, str) for s in sequences)):
+            # Single-character alphabet and string input: pad every
+            # sequence with a valid symbol (padding is never walked) and
+            # map the raw code points through a lookup table in one shot.
+            high = max(ord(s) for s in self.alphabet)
+            encoding, point = (('latin-1', np.uint8) if high < 256
+                               else ('utf-32-le', np.uint32))
+            pad = self.alphabet[0]
+            try:
+                raw = ''.join([s.ljust(width, pad)
+                               for s in sequences]).encode(encoding)
+            except UnicodeEncodeError as e:
+                raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                                 .format(e.object[e.start],
+                                         self.__class__.__name__))
+            points = np.frombuffer(raw, dtype=point)
+            lut = np.full(max(high + 2, 256), -1, dtype=np.int32)
+            for s, i in self.symbol_index.items():
+                lut[ord(s)] = i
+            flat = lut[np.minimum(points, len(lut) - 1)]
+            if (flat < 0).any():
+                bad = chr(int(points[np.argmax(flat < 0)]))
+                raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                                 .format(bad, self.__class__.__name__))
+            codes[:] = flat.reshape(len(sequences), width).T
+        else:
+            cols = self.symbol_index
+            for i, seq in enumerate(sequences):
+                try:
+                    codes[:len(seq), i] = [cols[s] for s in seq]
+                except KeyError as e:
+                    raise ValueError('sequence symbol {0} not in {1} '
+                                     'alphabet.'
+                                     .format(e.args[0],
+                                             self.__class__.__name__))
+        return codes.T, lengths
+
+    def accepts_batch(self, sequences):
+        """Boolean array telling which of `sequences` are accepted."""
+        import numpy as np
+        sequences = list(sequences)
+        lengths = np.fromiter((len(s) for s in sequences), dtype=np.intp,
+                              count=len(sequences))
+        # Longest first, so the sequences still running at column j are
+        # always a prefix of the batch and padding is never walked.
+        order = np.argsort(-lengths, kind='stable')
+        codes, lengths = self.encode_batch([sequences[i] for i in order])
+        codes = codes.T
+        table = self.numpy_table()
+        remaining = np.searchsorted(-lengths, -np.arange(codes.shape[0]),
+                                    side='left')
+        state = np.full(len(lengths), self.initial, dtype=np.intp)
+        for j in range(codes.shape[0]):
+            active = remaining[j]
+            state[:active] = table[state[:active], codes[j, :active]]
+        accept = np.frombuffer(bytes(self.accept), dtype=np.uint8)
+        result = np.empty(len(lengths), dtype=bool)
+        result[order] = accept[state] == 1
+        return result
+
+
+class StreamMatcher(object):
+    def __init__(self, compiled):
+        """Resumable matcher over input that arrives in chunks.
+
+        Only the current state and the number of symbols consumed are kept
+        between chunks. `rejected_at` is the offset of the first symbol that
+        led to the sink, or None while the input can still be accepted.
+        """
+        self.compiled = compiled
+        self.reset()
+
+    def __repr__(self):
+        return ('{0}(offset={1}, rejected_at={2})'
+                .format(self.__class__.__name__, self.offset,
+                        self.rejected_at))
+
+    def reset(self):
+        self._cur = self.compiled.initial * self.compiled.n_symbols
+        self.offset = 0
+        self.rejected_at = None
+
+    @property
+    def state(self):
+        """Name of the current state, or None once rejected."""
+        if self.rejected_at is not None:
+            return None
+        return self.compiled.names[self._cur // self.compiled.n_symbols]
+
+    def feed(self, chunk):
+        """Consume `chunk`; returns False once the input is rejected."""
+        if self.rejected_at is not None:
+            return False
+        compiled = self.compiled
+        table = compiled.table
+        cols = compiled.symbol_index
+        sink = compiled.sink * compiled.n_symbols
+        cur = self._cur
+        i = -1
+        try:
+            for i, s in enumerate(chunk):
+                cur = table[cur + cols[s]]
+                if cur == sink:
+                    self.rejected_at = self.offset + i
+                    self.offset += i + 1
+                    return False
+        except KeyError:
+            self._cur = cur
+            self.offset += i
+            raise ValueError('sequence symbol {0} at offset {1} not in {2} '
+                             'alphabet.'.format(s, self.offset,
+                                                compiled.__class__.__name__))
+        self._cur = cur
+        self.offset += i + 1
+        return True
+
+    def finish(self):
+        """Whether everything fed so far is accepted."""
+        if self.rejected_at is not None:
+            return False
+        return self.compiled.accept[self._cur // self.compiled.n_symbols] == 1
+
+
+class CompiledMealy(CompiledDFA):
+    def __init__(self, alphabet, names, table, accept, initial, outputs,
+                 pool, symbol_index=None):
+        """Compiled Mealy machine.
+
+        `outputs` has one entry per table cell holding an index into the
+        interned output strings in `pool`; pool[0] is always ''.
+        """
+        super(CompiledMealy, self).__init__(alphabet, names, table, accept,
+                                            initial, symbol_index)
+        self.outputs = outputs
+        self.pool = pool
+        self._pool_bytes = None
+
+    def symbol_classes(self):
+        """Like CompiledDFA.symbol_classes, but outputs must match too."""
+        k = self.n_symbols
+        rows = range(self.n_states + 1)
+        by_column = {}
+        for s in self.alphabet:
+            c = self.symbol_index[s]
+            column = tuple([(self.table[q * k + c], self.outputs[q * k + c])
+                            for q in rows])
+            by_column.setdefault(column, []).append(s)
+        return list(by_column.values())
+
+    def _with_columns(self, table, columns, symbol_index):
+        k, m = self.n_symbols, len(columns)
+        outputs = array('l', [0]) * len(table)
+        for q in range(self.n_states + 1):
+            for j, c in enumerate(columns):
+                outputs[q * m + j] = self.outputs[q * k + c]
+        return CompiledMealy(self.alphabet, self.names, table, self.accept,
+                             self.initial, outputs, self.pool,
+                             symbol_index=symbol_index)
+
+    def chunks(self, sequence):
+        """Lazily yield the non-empty output of each step.
+
+        Stops early on a missing transition; the generator's return value
+        tells whether the input was accepted.
+        """
+        table = self.table
+        outputs = self.outputs
+        pool = self.pool
+        cols = self.symbol_index
+        sink = self.sink * self.n_symbols
+        cur = self.initial * self.n_symbols
+        for s in sequence:
+            try:
+                cell = cur + cols[s]
+            except KeyError:
+                raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                                 .format(s, self.__class__.__name__))
+            nxt = table[cell]
+            if nxt == sink:
+                return False
+            out = outputs[cell]
+            if out:
+                yield pool[out]
+            cur = nxt
+        return self.accept[cur // self.n_symbols] == 1
+
+    def transduce(self, sequence, out=None):
+        """Run the machine quietly, writing its output into `out`.
+
+        `out` is any object with a `write` method, such as io.StringIO, or
+        a bytearray receiving UTF-8 output. Returns whether the input was
+        accepted, or (accepted, output string) when `out` is None, like
+        MealyMachine.process_sequence.
+        """
+        buffer = io.StringIO() if out is None else out
+        if isinstance(buffer, bytearray):
+            if self._pool_bytes is None:
+                self._pool_bytes = [p.encode('utf-8') for p in self.pool]
+            pool = self._pool_bytes
+            write = buffer.extend
+        else:
+            pool = self.pool
+            write = buffer.write
+        table = self.table
+        outputs = self.outputs
+        cols = self.symbol_index
+        sink = self.sink * self.n_symbols
+        cur = self.initial * self.n_symbols
+        accepted = None
+        try:
+            for s in sequence:
+                cell = cur + cols[s]
+                nxt = table[cell]
+                if nxt == sink:
+                    accepted = False
+                    break
+                if outputs[cell]:
+                    write(pool[outputs[cell]])
+                cur = nxt
+        except KeyError:
+            raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                             .format(s, self.__class__.__name__))
+        if accepted is None:
+            accepted = self.accept[cur // self.n_symbols] == 1
+        if out is None:
+            return accepted, buffer.getvalue()
+        return accepted
+
+
+def _symbol_byte(symbol):
+    if isinstance(symbol, int) and 0 <= symbol < 256:
+        return symbol
+    if isinstance(symbol, (bytes, bytearray)) and len(symbol) == 1:
+        return symbol[0]
+    if isinstance(symbol, str) and len(symbol) == 1 and ord(symbol) < 256:
+        return ord(symbol)
+    raise ValueError('alphabet symbol {!r} is not a single byte.'
+                     .format(symbol))
+
+
+class ByteScanner(object):
+    def __init__(self, compiled):
+        """Byte-level view of a compiled DFA.
+
+        `classes` maps each of the 256 byte values to its alphabet column,
+        bytes outside the alphabet going to an extra error column. Rows of
+        `table` have that extra column, so the scan is one lookup in each
+        table per byte and input is read through a memoryview, never decoded
+        or copied.
+        """
+        k = compiled.n_symbols
+        width = k + 1
+        self.compiled = compiled
+        self.width = width
+        self.classes = array('H', [k]) * 256
+        for s, i in compiled.symbol_index.items():
+            self.classes[_symbol_byte(s)] = i
+        self.sink = compiled.sink * width
+        self.error = (compiled.sink + 1) * width
+        self.table = array('l', [self.error]) * ((compiled.sink + 2) * width)
+        for q in range(compiled.sink + 1):
+            row = compiled.table[q * k:(q + 1) * k]
+            for c in range(k):
+                self.table[q * width + c] = row[c] // k * width
+        self.initial = compiled.initial * width
+
+    def __repr__(self):
+        return ('{0}(states={1}, symbols={2})'
+                .format(self.__class__.__name__, self.compiled.n_states,
+                        self.compiled.n_symbols))
+
+    def _walk(self, octets):
+        table = self.table
+        classes = self.classes
+        sink = self.sink
+        cur = self.initial
+        for b in octets:
+            cur = table[cur + classes[b]]
+            if cur >= sink:
+                if cur == sink:
+                    return False
+                raise ValueError('sequence byte {0!r} not in {1} alphabet.'
+                                 .format(bytes([b]),
+                                         self.__class__.__name__))
+        return self.compiled.accept[cur // self.width] == 1
+
+    def accepts(self, data):
+        """Scan any bytes-like object (bytes, bytearray, memoryview, mmap)."""
+        with memoryview(data) as view, view.cast('B') as octets:
+            return self._walk(octets)
+
+    def accepts_file(self, path):
+        with open(os.path.expanduser(path), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.accepts(b'')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.accepts(data)
+
+
+def _columns(dfa, alphabet):
+    """Table column of each transition symbol id of `dfa`."""
+    index = {s: i for i, s in enumerate(alphabet)}
+    cols = []
+    for symbol in dfa._symbols:
+        if symbol not in index:
+            raise ValueError('transition symbol not in {} alphabet.'
+                             .format(dfa.__class__.__name__))
+        cols.append(index[symbol])
+    return cols
+
+
+def compile_dfa(dfa):
+    if dfa._initial < 0:
+        raise RuntimeError('{} has no initial state.'
+                           .format(dfa.__class__.__name__))
+    alphabet = list(dfa.alphabet)
+    n_symbols = len(alphabet)
+    if n_symbols == 0:
+        raise RuntimeError('{} without alphabet.'
+                           .format(dfa.__class__.__name__))
+    cols = _columns(dfa, alphabet)
+    sink = dfa._n
+    # Every cell starts pointing to the sink row, stored as a row offset.
+    table = array('l', [sink * n_symbols]) * ((sink + 1) * n_symbols)
+    filled = bytearray((sink + 1) * n_symbols)
+    # Each state's transitions are visited in the order process_sequence
+    # tries them, so the first one on a symbol wins.
+    edges = zip(dfa._src, dfa._dst, dfa._sym)
+    if dfa._reordered:
+        edges = [(dfa._src[e], dfa._dst[e], dfa._sym[e])
+                 for e in dfa._edge_order()]
+    for from_, to_, sym in edges:
+        cell = from_ * n_symbols + cols[sym]
+        if filled[cell]:
+            continue
+        filled[cell] = 1
+        table[cell] = to_ * n_symbols
+    accept = bytearray(sink + 1)
+    for byte, bits in enumerate(dfa._accept):
+        while bits:
+            low = bits & -bits
+            accept[byte * 8 + low.bit_length() - 1] = 1
+            bits ^= low
+    return CompiledDFA(alphabet, dfa._name_table(), table, accept,
+                       dfa._initial)
+
+
+def compile_mealy(machine):
+    base = compile_dfa(machine)
+    k = base.n_symbols
+    cols = _columns(machine, base.alphabet)
+    outputs = array('l', [0]) * len(base.table)
+    filled = bytearray(len(base.table))
+    edges = zip(machine._src, machine._sym, machine._out)
+    if machine._reordered:
+        edges = [(machine._src[e], machine._sym[e], machine._out[e])
+                 for e in machine._edge_order()]
+    for from_, sym, out in edges:
+        cell = from_ * k + cols[sym]
+        if filled[cell]:
+            continue
+        filled[cell] = 1
+        outputs[cell] = out
+    return CompiledMealy(base.alphabet, base.names, base.table, base.accept,
+                         base.initial, outputs, list(machine._pool))
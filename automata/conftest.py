@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import itertools
+import random
+
+import pytest
+
+from automata.dfa import DFA, MealyMachine
+
+
+def _fill(machine, rnd, n_states, outputs=None):
+    for i in range(n_states):
+        machine.add_state(initial=i == 0, accept=rnd.random() < 0.4)
+    if not machine.get_accept_states():
+        machine.states[-1].accept = True
+    for i in range(n_states):
+        for s in machine.alphabet:
+            # State 0 always moves on the first symbol, so the machine has
+            # at least one transition.
+            if (i, s) == (0, machine.alphabet[0]) or rnd.random() < 0.8:
+                args = ['q_{}'.format(i),
+                        'q_{}'.format(rnd.randrange(n_states)), s]
+                if outputs is not None:
+                    args.append(rnd.choice(outputs))
+                machine.add_transition(*args)
+    return machine
+
+
+@pytest.fixture
+def random_dfa():
+    """Build a random DFA from a seed; states are named q_<i>."""
+    def build(seed, n_states=6, alphabet='ab'):
+        return _fill(DFA(list(alphabet)), random.Random(seed), n_states)
+    return build
+
+
+@pytest.fixture
+def random_mealy():
+    """Build a random Mealy machine writing '', 'x', 'y' or 'xy'."""
+    def build(seed, n_states=6, alphabet='ab', out_alphabet='xy'):
+        machine = MealyMachine(list(alphabet), list(out_alphabet))
+        outputs = [''] + list(out_alphabet) + [out_alphabet]
+        return _fill(machine, random.Random(seed), n_states, outputs)
+    return build
+
+
+@pytest.fixture
+def words():
+    """Every string over `alphabet` of length at most `max_length`."""
+    def build(alphabet='ab', max_length=6):
+        return [''.join(w) for n in range(max_length + 1)
+                for w in itertools.product(alphabet, repeat=n)]
+    return build
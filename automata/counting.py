@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+def _targets(compiled):
+    k = compiled.n_symbols
+    rows = compiled.n_states + 1
+    targets = np.asarray(compiled.table, dtype=np.int64).reshape(rows, k) // k
+    sizes = np.zeros(k, dtype=np.int64)
+    for s in compiled.alphabet:
+        sizes[compiled.symbol_index[s]] += 1
+    return targets, sizes
+
+
+def _dtype(compiled, n, bound):
+    # Every count is at most `bound` times alphabet size ** n.
+    if bound * max(len(compiled.alphabet), 1) ** n < 2 ** 63:
+        return np.int64
+    return object
+
+
+def adjacency_matrix(compiled, dtype=np.int64):
+    """m[p, q]: how many symbols move row p of `compiled` to row q."""
+    targets, sizes = _targets(compiled)
+    rows = len(targets)
+    m = np.zeros((rows, rows), dtype=np.int64)
+    np.add.at(m, (np.repeat(np.arange(rows), len(sizes)), targets.ravel()),
+              np.tile(sizes, rows))
+    return m.astype(dtype)
+
+
+def _power(m, n):
+    result = np.identity(len(m), dtype=np.int64).astype(m.dtype)
+    while n:
+        if n & 1:
+            result = result.dot(m)
+        m = m.dot(m)
+        n >>= 1
+    return result
+
+
+def _squaring_pays(compiled, n):
+    rows = compiled.n_states + 1
+    return rows ** 3 * 2 * n.bit_length() < n * rows * compiled.n_symbols
+
+
+def count_accepted(compiled, n, upto=False):
+    """Number of accepted inputs of length `n`, or of at most `n` if `upto`.
+
+    Either n steps of dynamic programming over the table or about
+    2 log2(n) products of the adjacency matrix, whichever costs less.
+    Counts are int64 while they provably fit and Python integers after.
+    """
+    if n < 0:
+        raise ValueError('length must be non negative.')
+    dtype = _dtype(compiled, n, n + 1 if upto else 1)
+    accept = np.array([int(a) for a in compiled.accept]).astype(dtype)
+    if _squaring_pays(compiled, n):
+        m = adjacency_matrix(compiled, dtype)
+        if upto:
+            # The top right block of [[M, I], [0, I]] ** (n + 1) is
+            # I + M + ... + M ** n.
+            rows = len(m)
+            block = np.zeros((2 * rows, 2 * rows), dtype=np.int64)
+            block = block.astype(dtype)
+            block[:rows, :rows] = m
+            block[:rows, rows:] = np.identity(rows, dtype=np.int64)
+            block[rows:, rows:] = np.identity(rows, dtype=np.int64)
+            m = _power(block, n + 1)[:rows, rows:]
+        else:
+            m = _power(m, n)
+        return int(m[compiled.initial].dot(accept))
+    targets, sizes = _targets(compiled)
+    sizes = sizes.astype(dtype)
+    counts = accept
+    total = counts[compiled.initial]
+    for _ in range(n):
+        counts = (counts[targets] * sizes).sum(axis=1)
+        total += counts[compiled.initial]
+    return int(total if upto else counts[compiled.initial])
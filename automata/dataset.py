@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""Friend-pattern dataset tools: edge lists loaded as CSR arrays, pattern
+generation and the parallel classifier.
+
+NumPy is imported by the functions that need it, so FacebookIPR alone
+does not load it.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .regexp import compile_regex
+
+__all__ = ['CSRGraph', 'load_edges', 'gen_dataset', 'GENUINE_FP', 'FAKE_FP',
+           'genuine_mask', 'gen_fake', 'PATTERN_LENGTHS', 'friend_pattern',
+           'FacebookIPR', 'classify_shard', 'classify_dataset', 'main']
+
+
+class CSRGraph(object):
+    def __init__(self, offsets, neighbors):
+        """Adjacency of nodes 0 .. n - 1 in compressed sparse row form.
+
+        The neighbors of node u are neighbors[offsets[u]:offsets[u + 1]],
+        in file order.
+        """
+        self.offsets = offsets
+        self.neighbors = neighbors
+
+    def __repr__(self):
+        return '{0}(nodes={1}, edges={2})'.format(
+            self.__class__.__name__, len(self), len(self.neighbors))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node):
+        return self.neighbors[self.offsets[node]:self.offsets[node + 1]]
+
+    def degrees(self):
+        import numpy as np
+        return np.diff(self.offsets)
+
+    def sources(self):
+        """Nodes with at least one neighbor."""
+        import numpy as np
+        return np.flatnonzero(self.degrees())
+
+    def items(self):
+        """(node, neighbors) for every node with at least one neighbor."""
+        for node in self.sources():
+            yield int(node), self[node]
+
+    def chunks(self, size):
+        """Split the nodes into runs of `size` consecutive ids.
+
+        Yields (first node, offsets, neighbors) where offsets are relative
+        to the neighbors slice, so each chunk is a CSR of its own.
+        """
+        for first in range(0, len(self), size):
+            last = min(first + size, len(self))
+            start = self.offsets[first]
+            yield (first, self.offsets[first:last + 1] - start,
+                   self.neighbors[start:self.offsets[last]])
+
+
+def _parse_edges(block):
+    import numpy as np
+    if b'#' in block:
+        block = b'\n'.join(line for line in block.split(b'\n')
+                           if not line.lstrip().startswith(b'#'))
+    values = np.array(block.split(), dtype=np.int64)
+    if len(values) % 2:
+        raise ValueError('edge list has a line without two node ids.')
+    return values[0::2], values[1::2]
+
+
+def load_edges(fname, block_size=1 << 24, n_nodes=None):
+    """Read a whitespace separated edge list into a CSRGraph.
+
+    The file is parsed `block_size` bytes at a time, so only the integer
+    arrays are ever held in memory; lines starting with '#' are skipped.
+    Node ids must be non negative integers; there are `n_nodes` nodes,
+    by default one more than the largest id seen.
+    """
+    import numpy as np
+    sources = []
+    targets = []
+    rest = b''
+    with open(os.path.expanduser(fname), 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind(b'\n') + 1
+            block, rest = block[:cut], block[cut:]
+            if block.strip():
+                u, v = _parse_edges(block)
+                sources.append(u)
+                targets.append(v)
+    if rest.strip():
+        u, v = _parse_edges(rest)
+        sources.append(u)
+        targets.append(v)
+    sources = np.concatenate(sources) if sources else np.zeros(0, np.int64)
+    targets = np.concatenate(targets) if targets else np.zeros(0, np.int64)
+    if n_nodes is None:
+        n_nodes = int(max(sources.max(initial=-1),
+                          targets.max(initial=-1))) + 1
+    dtype = np.int32 if n_nodes < 2 ** 31 else np.int64
+    if len(sources) and np.any(sources[1:] < sources[:-1]):
+        order = np.argsort(sources, kind='stable')
+        sources = sources[order]
+        targets = targets[order]
+    offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n_nodes), out=offsets[1:])
+    return CSRGraph(offsets, targets.astype(dtype))
+
+
+def gen_dataset(fname):
+    """Friend lists keyed by profile id, as strings.
+
+    Kept for the callers wanting plain lists; load_edges is much lighter.
+    """
+    graph = load_edges(fname)
+    return {str(node): [str(fr) for fr in friends.tolist()]
+            for node, friends in graph.items()}
+
+
+GENUINE_FP = '(a|b)*a#'  # Facebook FP
+FAKE_FP = '(a*|b)(b|ab*a)#'
+
+
+def genuine_mask(n_total=4039, n_genuines=1399, rng=None):
+    """Boolean mask over profile ids, True for the genuine ones."""
+    import numpy as np
+    rng = np.random.default_rng(rng)
+    mask = np.zeros(n_total, dtype=bool)
+    mask[rng.choice(n_total, size=n_genuines, replace=False)] = True
+    return mask
+
+
+def gen_fake(n_total=4039, n_genuines=1399, rng=None):
+    import numpy as np
+    mask = genuine_mask(n_total, n_genuines, rng)
+    return np.flatnonzero(mask), np.flatnonzero(~mask)
+
+
+# Lengths of the generated friend patterns, '#' included.
+PATTERN_LENGTHS = range(2, 65)
+
+
+@lru_cache(maxsize=None)
+def _pattern_dfa(pattern):
+    return compile_regex(pattern, ['a', 'b', '#'])
+
+
+def _draw_unique(pattern, n, seen, rng, max_rounds=100):
+    dfa = _pattern_dfa(pattern)
+    found = []
+    for _ in range(max_rounds):
+        if len(found) == n:
+            break
+        for fp in dfa.sample(n - len(found), PATTERN_LENGTHS, rng):
+            if fp not in seen:
+                seen.add(fp)
+                found.append(fp)
+    else:
+        if len(found) < n:
+            raise ValueError('could not draw {0} distinct strings of {1}.'
+                             .format(n, pattern))
+    return found
+
+
+def friend_pattern(px_friend_list, genuine, rng=None):
+    """Distinct friend patterns and their labels for one profile.
+
+    `genuine` is the mask from genuine_mask. Returns the patterns, in
+    friend order, and a boolean array telling which ones are genuine.
+    Patterns are drawn uniformly among the strings of PATTERN_LENGTHS
+    matching GENUINE_FP or FAKE_FP.
+    """
+    import numpy as np
+    rng = np.random.default_rng(rng)
+    labels = genuine[np.asarray(px_friend_list, dtype=np.intp)]
+    seen = set()
+    patterns = np.empty(len(labels), dtype=object)
+    patterns[labels] = _draw_unique(GENUINE_FP, int(labels.sum()), seen,
+                                    rng)
+    patterns[~labels] = _draw_unique(FAKE_FP, int((~labels).sum()), seen,
+                                     rng)
+    return patterns.tolist(), labels
+
+
+class FacebookIPR(object):
+    # Same language as the automaton this class used to wire by hand: at
+    # least two symbols, the last one an 'a', before the closing '#'.
+    pattern = '(a|b)+a#'
+
+    def __init__(self, pattern=None):
+        """"""
+        if pattern is not None:
+            self.pattern = pattern
+        self.dfa = compile_regex(self.pattern, ['a', 'b', '#'])
+        self.compiled = self.dfa.compile()
+
+    def check_profile(self, profile):
+        return self.compiled.accepts(profile)
+
+    def check_profiles(self, profiles):
+        return self.compiled.accepts_batch(profiles)
+
+
+# Per-process state set up once by _init_worker.
+_worker = {}
+
+
+def _init_worker(fb_ipr, genuine, seed):
+    _worker['fb_ipr'] = fb_ipr
+    _worker['genuine'] = genuine
+    _worker['seed'] = seed
+
+
+def classify_shard(shard):
+    """Generate and classify the friend patterns of a list of profiles.
+
+    Returns (test genuine count, test fake count, predicted genuine count,
+    predicted fake count, y_test, y_pred) for the shard. Each profile's
+    patterns are drawn from a generator seeded with the run seed and the
+    profile id.
+    """
+    import numpy as np
+    fb_ipr = _worker['fb_ipr']
+    test_genuine_count = test_fake_count = 0
+    genuine_count = fake_count = 0
+    y_test = []
+    y_pred = []
+    for px, fl in shard:
+        rng = np.random.default_rng([_worker['seed'], int(px)])
+        fl_intances, labels = friend_pattern(fl, _worker['genuine'], rng)
+        test_genuine_count += int(labels.sum())
+        test_fake_count += int(len(labels) - labels.sum())
+        y_test.extend(np.where(labels, 'genuine', 'fake').tolist())
+        pred = fb_ipr.check_profiles(fl_intances)
+        genuine_count += int(pred.sum())
+        fake_count += int(len(pred) - pred.sum())
+        y_pred.extend(np.where(pred, 'genuine', 'fake').tolist())
+    return (test_genuine_count, test_fake_count, genuine_count, fake_count,
+            y_test, y_pred)
+
+
+def classify_dataset(ds, fb_ipr, genuine, workers=None, shards=None,
+                     seed=None):
+    """Classify every profile of `ds` on a pool of `workers` processes.
+
+    `ds` is a CSRGraph or a dict of friend lists and `genuine` the mask
+    from genuine_mask. The profiles are split into `shards` contiguous
+    slices (four per worker by default) and the shard results are merged
+    back in profile order, with the same fields as classify_shard. The
+    output only depends on `seed`, not on how the work was split.
+    """
+    import numpy as np
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if shards is None:
+        shards = 4 * workers
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    items = list(ds.items())
+    size = max(1, -(-len(items) // shards))
+    slices = [items[i:i + size] for i in range(0, len(items), size)]
+    counts = [0, 0, 0, 0]
+    y_test = []
+    y_pred = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(fb_ipr, genuine, seed)) as executor:
+        for result in executor.map(classify_shard, slices):
+            for j in range(4):
+                counts[j] += result[j]
+            y_test.extend(result[4])
+            y_pred.extend(result[5])
+    return tuple(counts) + (y_test, y_pred)
+
+
+def main(argv=None):
+    """Classify the Facebook dataset, the edge list at argv[0] if given."""
+    if argv is None:
+        argv = sys.argv[1:]
+    fname = argv[0] if argv else '~/Downloads/facebook_combined.txt'
+    fb_ipr = FacebookIPR()
+    ds = load_edges(fname)
+    genuine = genuine_mask(len(ds))
+    (test_genuine_count, test_fake_count, genuine_count, fake_count,
+     y_test, y_pred) = classify_dataset(ds, fb_ipr, genuine)
+    print('Number of test genuine profiles: {}'.format(test_genuine_count))
+    print('Number of predicted genuine profiles: {}'.format(genuine_count))
+    print('Number of test fake profiles: {}'.format(test_fake_count))
+    print('Number of predicted fake profiles: {}'.format(fake_count))
+    print('done.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1332 @@
+# -*- coding: utf-8 -*-
+"""DFA, Mealy and Moore machines over named states.
+
+A DFA keeps its states as integer ids into flat arrays: accept flags in a
+bit array, transitions in typed arrays of source, target and symbol ids
+chained per source state, and names in a side table holding only the
+names other than the default q_<id>. `states`, `transitions` and
+`initial_state` are made of __slots__ views over those arrays, built on
+access; a view is a position, so it goes stale once minimization or
+trimming renumbers the states.
+
+NumPy is only imported by the features that need it (sampling, counting
+and the batch helpers of the compiled tables).
+"""
+import copy
+from array import array
+from collections.abc import Sequence
+
+from .compiled import CompiledMealy, compile_dfa, compile_mealy
+from .equivalence import hopcroft_karp
+from .minimization import adjacency, hopcroft, mark_from
+from .product import OPERATIONS, product
+from .profiling import Profile
+from .tracing import NULL_TRACE, PrintTrace
+from . import serialize
+
+
+def _single_chars(symbols):
+    return all(isinstance(s, str) and len(s) == 1 for s in symbols)
+
+
+def _default_id(name):
+    """i when `name` is the default name q_<i>, -1 otherwise."""
+    if isinstance(name, str) and name[:2] == 'q_':
+        digits = name[2:]
+        if (digits.isascii() and digits.isdigit()
+                and (digits[0] != '0' or len(digits) == 1)):
+            return int(digits)
+    return -1
+
+
+class DFAState(object):
+    __slots__ = ('name', 'initial', 'accept', 'transitions')
+
+    def __init__(self, name, initial=False, accept=False):
+        """"""
+        self.name = name
+        self.initial = initial
+        self.accept = accept
+        self.transitions = []
+
+    def __repr__(self):
+        return "{0}(initial={1}, accept={2})".format(self.name, self.initial,
+                                                     self.accept)
+
+    def add_transition(self, to_, symbol):
+        self.transitions.append((to_, symbol))
+
+
+class MooreState(DFAState):
+    __slots__ = ('out_symbol',)
+
+    def __init__(self, name, out_symbol, initial=False, accept=False):
+        """"""
+        super(MooreState, self).__init__(name, initial, accept)
+        self.out_symbol = out_symbol
+
+    def __repr__(self):
+        return ("{0}/{1}(initial={2}, accept={3})"
+                .format(self.name, self.out_symbol, self.initial, self.accept))
+
+
+class MealyState(DFAState):
+    __slots__ = ()
+
+    def add_transition(self, to_, symbol, out_symbol):
+        self.transitions.append((to_, symbol, out_symbol))
+
+
+class StateView(object):
+    """State `id` of `automaton`, with the attributes of a DFAState.
+
+    Reading an attribute builds it from the automaton's arrays and
+    assigning one writes it back. `transitions` is a tuple, unlike the
+    list of a DFAState: changing a state's transitions goes through
+    add_transition or by assigning the attribute, since appending to a
+    copy would be silently lost.
+    """
+    __slots__ = ('automaton', 'id')
+
+    def __init__(self, automaton, id_):
+        self.automaton = automaton
+        self.id = id_
+
+    @property
+    def name(self):
+        return self.automaton._name(self.id)
+
+    @name.setter
+    def name(self, name):
+        self.automaton._rename(self.id, name)
+
+    @property
+    def initial(self):
+        return self.id == self.automaton._initial
+
+    @property
+    def accept(self):
+        return self.automaton._is_accept(self.id)
+
+    @accept.setter
+    def accept(self, accept):
+        self.automaton._set_accept(self.id, accept)
+
+    @property
+    def transitions(self):
+        return self.automaton._transitions_of(self.id)
+
+    @transitions.setter
+    def transitions(self, transitions):
+        self.automaton._set_transitions(self.id, transitions)
+
+    def add_transition(self, to_, symbol):
+        self.automaton._add_edge(self.id, self.automaton._id_of(to_), symbol)
+
+    def __eq__(self, other):
+        return (isinstance(other, StateView)
+                and other.automaton is self.automaton and other.id == self.id)
+
+    def __hash__(self):
+        return hash((id(self.automaton), self.id))
+
+    def __repr__(self):
+        return "{0}(initial={1}, accept={2})".format(self.name, self.initial,
+                                                     self.accept)
+
+
+class MealyStateView(StateView):
+    __slots__ = ()
+
+    def add_transition(self, to_, symbol, out_symbol):
+        self.automaton._add_edge(self.id, self.automaton._id_of(to_), symbol,
+                                 out_symbol)
+
+
+class StateList(Sequence):
+    """The states of an automaton, as views built on access."""
+    __slots__ = ('automaton',)
+
+    def __init__(self, automaton):
+        self.automaton = automaton
+
+    def __len__(self):
+        return self.automaton._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = self.automaton._n
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('state index out of range')
+        return self.automaton._view(i)
+
+    def __iter__(self):
+        view = self.automaton._view
+        for i in range(self.automaton._n):
+            yield view(i)
+
+    def __contains__(self, state):
+        return (isinstance(state, StateView)
+                and state.automaton is self.automaton
+                and 0 <= state.id < self.automaton._n)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class TransitionList(Sequence):
+    """The transitions of an automaton in storage order, as
+    (from_state, to_state, symbol[, out_symbol]) tuples built on access.
+
+    That is the order they were added until one is dropped, which moves
+    the last one into its place."""
+    __slots__ = ('automaton',)
+
+    def __init__(self, automaton):
+        self.automaton = automaton
+
+    def __len__(self):
+        return len(self.automaton._dst)
+
+    def __getitem__(self, e):
+        if isinstance(e, slice):
+            return [self[j] for j in range(*e.indices(len(self)))]
+        if e < 0:
+            e += len(self)
+        if not 0 <= e < len(self):
+            raise IndexError('transition index out of range')
+        return self.automaton._edge(e)
+
+    def __iter__(self):
+        edge = self.automaton._edge
+        for e in range(len(self)):
+            yield edge(e)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class NameTable(object):
+    def __init__(self, custom, n_states):
+        """Names of `n_states` states: q_<id> unless `custom` has the id."""
+        self.custom = custom
+        self.n_states = n_states
+
+    def __len__(self):
+        return self.n_states
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.n_states
+        if not 0 <= i < self.n_states:
+            raise IndexError('state index out of range')
+        name = self.custom.get(i)
+        return 'q_{}'.format(i) if name is None else name
+
+    def __iter__(self):
+        for i in range(self.n_states):
+            yield self[i]
+
+
+class DFA(object):
+    # Where process_sequence reports its steps unless given a trace.
+    trace = NULL_TRACE
+    # What `states`, `initial_state` and get_state return.
+    state_view = StateView
+    # The per-transition arrays, moved together when one is dropped.
+    _edge_columns = ('_src', '_dst', '_sym', '_next')
+
+    def __init__(self, alphabet=None):
+        """"""
+        if alphabet is None:
+            alphabet = []
+        self.alphabet = alphabet
+        # Transition symbols by id, in order of first use.
+        self._symbols = []
+        self._symbol_ids = {}
+        self._clear()
+        self._sampler = None
+
+    def _clear(self):
+        """Drop every state and transition."""
+        self._n = 0
+        self._initial = -1
+        # One accept bit per state, state i at bit i % 8 of byte i // 8.
+        self._accept = bytearray()
+        # Names other than q_<id> by id, and the ids they are looked up by;
+        # _shadowed holds the names a later state has but cannot be found
+        # by, an earlier one having them first.
+        self._names = {}
+        self._ids = {}
+        self._shadowed = set()
+        self._clear_transitions()
+
+    def _clear_transitions(self):
+        # Transition e goes from _src[e] to _dst[e] on _symbols[_sym[e]];
+        # _head and _tail hold the first and last transition of each
+        # state and _next the following one from the same state, -1 ending
+        # the chain.
+        self._src = array('i')
+        self._dst = array('i')
+        self._sym = array('i')
+        self._next = array('i')
+        self._head = array('i', [-1]) * self._n
+        self._tail = array('i', [-1]) * self._n
+        # Whether dropping a transition moved another one, so the storage
+        # order no longer follows each state's chain.
+        self._reordered = False
+        self._compiled = None
+
+    @property
+    def states(self):
+        return StateList(self)
+
+    @property
+    def transitions(self):
+        return TransitionList(self)
+
+    @property
+    def initial_state(self):
+        if self._initial < 0:
+            return None
+        return self._view(self._initial)
+
+    @initial_state.setter
+    def initial_state(self, state):
+        self._initial = -1 if state is None else self._id_of(state)
+        self._compiled = None
+
+    def _view(self, i):
+        return self.state_view(self, i)
+
+    def _id_of(self, state):
+        if (not isinstance(state, StateView)
+                or state.automaton is not self
+                or not 0 <= state.id < self._n):
+            raise ValueError('state {0} not in {1}.'
+                             .format(getattr(state, 'name', state),
+                                     self.__class__.__name__))
+        return state.id
+
+    def _name(self, i):
+        name = self._names.get(i)
+        return 'q_{}'.format(i) if name is None else name
+
+    def _name_table(self):
+        # A copy, as renaming changes _names in place.
+        return NameTable(dict(self._names), self._n)
+
+    def _index_name(self, i, name, j):
+        # The first state with a name keeps it, as with a dict setdefault;
+        # j is _default_id(name).
+        if name in self._ids or (0 <= j < i and j not in self._names):
+            self._shadowed.add(name)
+        else:
+            self._ids[name] = i
+
+    def _find(self, name):
+        """Id of the first state called `name`, -1 if there is none."""
+        i = self._ids.get(name, -1)
+        if i < 0:
+            i = _default_id(name)
+            if i >= self._n or i in self._names:
+                return -1
+        return i
+
+    def _reindex(self):
+        self._ids = {}
+        self._shadowed = set()
+        for i in sorted(self._names):
+            name = self._names[i]
+            self._index_name(i, name, _default_id(name))
+        self._compiled = None
+
+    def _rename(self, i, name):
+        old = self._name(i)
+        if name == old:
+            return
+        # Unless another state has or may take over one of the names, only
+        # this state's entries change.
+        shared = old in self._shadowed or self._find(name) >= 0
+        if not shared and self._ids.get(old) == i:
+            del self._ids[old]
+        j = _default_id(name)
+        if j == i:
+            self._names.pop(i, None)
+        else:
+            self._names[i] = name
+            if not shared:
+                self._index_name(i, name, j)
+        if shared:
+            self._reindex()
+        self._compiled = None
+
+    def _is_accept(self, i):
+        return self._accept[i >> 3] >> (i & 7) & 1 == 1
+
+    def _set_accept(self, i, accept):
+        if accept:
+            self._accept[i >> 3] |= 1 << (i & 7)
+        else:
+            self._accept[i >> 3] &= 0xff ^ (1 << (i & 7))
+        self._compiled = None
+
+    def _symbol_id(self, symbol):
+        sym = self._symbol_ids.get(symbol)
+        if sym is None:
+            sym = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return sym
+
+    def _add_edge(self, i, j, symbol):
+        """Append a transition from state id i to state id j."""
+        e = len(self._dst)
+        self._src.append(i)
+        self._dst.append(j)
+        self._sym.append(self._symbol_id(symbol))
+        self._next.append(-1)
+        tail = self._tail
+        if tail[i] < 0:
+            self._head[i] = e
+        else:
+            self._next[tail[i]] = e
+        tail[i] = e
+        self._compiled = None
+
+    def _put_edge(self, e, j, symbol):
+        """Point transition e to state id j on `symbol`."""
+        self._dst[e] = j
+        self._sym[e] = self._symbol_id(symbol)
+        self._compiled = None
+
+    def _before(self, e):
+        """Transition ahead of e from the same state, -1 if e is first."""
+        p = self._head[self._src[e]]
+        if p == e:
+            return -1
+        while self._next[p] != e:
+            p = self._next[p]
+        return p
+
+    def _drop_edge(self, e):
+        """Remove transition e, moving the last transition into its slot.
+
+        Each state keeps the order of its own transitions; only the storage
+        order of all of them changes.
+        """
+        i = self._src[e]
+        before = self._before(e)
+        if before < 0:
+            self._head[i] = self._next[e]
+        else:
+            self._next[before] = self._next[e]
+        if self._tail[i] == e:
+            self._tail[i] = before
+        last = len(self._dst) - 1
+        if e != last:
+            i = self._src[last]
+            before = self._before(last)
+            for column in self._edge_columns:
+                values = getattr(self, column)
+                values[e] = values[last]
+            if before < 0:
+                self._head[i] = e
+            else:
+                self._next[before] = e
+            if self._tail[i] == last:
+                self._tail[i] = e
+            self._reordered = True
+        for column in self._edge_columns:
+            getattr(self, column).pop()
+        self._compiled = None
+
+    def _edges_from(self, i):
+        e = self._head[i]
+        while e >= 0:
+            yield e
+            e = self._next[e]
+
+    def _edge_order(self):
+        """Every transition, those of each state in the order they are
+        tried."""
+        if not self._reordered:
+            return range(len(self._dst))
+        return [e for i in range(self._n) for e in self._edges_from(i)]
+
+    def _label(self, e):
+        """What follows the target state in the tuple of transition e."""
+        return (self._symbols[self._sym[e]],)
+
+    def _outputs(self):
+        """Output ids of the transitions and the outputs they index, or
+        (None, None) when transitions have no output."""
+        return None, None
+
+    def _edge(self, e):
+        return (self._view(self._src[e]),
+                self._view(self._dst[e])) + self._label(e)
+
+    def _transitions_of(self, i):
+        return tuple([(self._view(self._dst[e]),) + self._label(e)
+                      for e in self._edges_from(i)])
+
+    def _set_transitions(self, i, transitions):
+        transitions = [(self._id_of(t[0]),) + tuple(t[1:])
+                       for t in transitions]
+        # The state's transitions are rewritten in place, and only the
+        # difference in number is added or dropped.
+        e = self._head[i]
+        for t in transitions:
+            if e < 0:
+                self._add_edge(i, *t)
+            else:
+                self._put_edge(e, *t)
+                e = self._next[e]
+        extra = 0
+        while e >= 0:
+            extra += 1
+            e = self._next[e]
+        for _ in range(extra):
+            self._drop_edge(self._tail[i])
+
+    def add_state(self, name=None, initial=False, accept=False):
+        if initial and self._initial >= 0:
+            raise ValueError('{} already has an initial state.'
+                             .format(self.__class__.__name__))
+        i = self._n
+        if name is not None:
+            j = _default_id(name)
+            if j != i:
+                self._names[i] = name
+                self._index_name(i, name, j)
+        self._n = i + 1
+        if i & 7 == 0:
+            self._accept.append(0)
+        if accept:
+            self._accept[i >> 3] |= 1 << (i & 7)
+        self._head.append(-1)
+        self._tail.append(-1)
+        if initial:
+            self._initial = i
+        self._compiled = None
+
+    def add_transition(self, from_name, to_name, symbol):
+        if len(self.alphabet) == 0:
+            raise RuntimeError('{} without alphabet.'
+                               .format(self.__class__.__name__))
+        if symbol not in self.alphabet:
+            raise ValueError('transition symbol not in {} alphabet.'
+                             .format(self.__class__.__name__))
+        from_ = self._find(from_name)
+        to_ = self._find(to_name)
+        if from_ < 0:
+            raise ValueError('state {0} not in {1}.'
+                             .format(from_name, self.__class__.__name__))
+        if to_ < 0:
+            raise ValueError('state {0} not in {1}.'
+                             .format(to_name, self.__class__.__name__))
+        self._add_edge(from_, to_, symbol)
+
+    @classmethod
+    def from_edges(cls, alphabet, states, edges, initial=None, accept=()):
+        """Build a DFA from state names and (from, to, symbol) edges.
+
+        `initial` defaults to the first state and `accept` lists the names
+        of the accept states.
+        """
+        dfa = cls(alphabet)
+        if len(dfa.alphabet) == 0:
+            raise RuntimeError('{} without alphabet.'.format(cls.__name__))
+        states = list(states)
+        if initial is None and states:
+            initial = states[0]
+        accept = set(accept)
+        for name in states:
+            dfa.add_state(name, initial=name == initial,
+                          accept=name in accept)
+        if initial is not None and dfa._initial < 0:
+            raise ValueError('state {0} not in {1}.'
+                             .format(initial, cls.__name__))
+        symbols = set(dfa.alphabet)
+        ids = {}
+        for i, name in enumerate(states):
+            ids.setdefault(name, i)
+        add_edge = dfa._add_edge
+        for from_name, to_name, symbol in edges:
+            if symbol not in symbols:
+                raise ValueError('transition symbol not in {} alphabet.'
+                                 .format(cls.__name__))
+            try:
+                from_ = ids[from_name]
+                to_ = ids[to_name]
+            except KeyError as e:
+                raise ValueError('state {0} not in {1}.'
+                                 .format(e.args[0], cls.__name__))
+            add_edge(from_, to_, symbol)
+        return dfa
+
+    @classmethod
+    def from_table(cls, alphabet, table, initial=0, accept=(), names=None):
+        """Build a DFA from a states x symbols table of target indices.
+
+        `table` may be a nested sequence or a 2-D NumPy array; negative
+        entries mean there is no transition. `accept` is either a sequence
+        of state indices or a boolean mask, and states are named q_<i>
+        unless `names` is given.
+        """
+        # Array rows are converted one at a time, not the whole table.
+        if not hasattr(table, 'tolist'):
+            table = list(table)
+        n_states = len(table)
+        if names is not None:
+            names = list(names)
+            if len(names) != n_states:
+                raise ValueError('{0} table has {1} rows for {2} names.'
+                                 .format(cls.__name__, n_states, len(names)))
+        if hasattr(accept, 'tolist'):
+            accept = accept.tolist()
+        accept = list(accept)
+        if accept and len(accept) == n_states and all(
+                isinstance(a, bool) for a in accept):
+            accept = [i for i, a in enumerate(accept) if a]
+        accept = set(range(n_states)[i] for i in accept)
+        alphabet = list(alphabet)
+        dfa = cls(alphabet)
+        if len(dfa.alphabet) == 0:
+            raise RuntimeError('{} without alphabet.'.format(cls.__name__))
+        if n_states:
+            initial = range(n_states)[initial]
+        for i in range(n_states):
+            dfa.add_state(None if names is None else names[i],
+                          initial=i == initial, accept=i in accept)
+        add_edge = dfa._add_edge
+        for i, row in enumerate(table):
+            row = row.tolist() if hasattr(row, 'tolist') else list(row)
+            if len(row) != len(alphabet):
+                raise ValueError('{0} table row {1} does not match the '
+                                 'alphabet size.'.format(cls.__name__, i))
+            for symbol, j in zip(alphabet, row):
+                if j >= 0:
+                    if j >= n_states:
+                        raise ValueError('state {0} not in {1}.'
+                                         .format(j, cls.__name__))
+                    add_edge(i, j, symbol)
+        return dfa
+
+    @classmethod
+    def from_compiled(cls, compiled):
+        """Rebuild a DFA from a compiled table."""
+        k = compiled.n_symbols
+        columns = [compiled.symbol_index[s] for s in compiled.alphabet]
+        table = []
+        for q in range(compiled.n_states):
+            row = []
+            for c in columns:
+                to_ = compiled.table[q * k + c] // k
+                row.append(to_ if to_ != compiled.sink else -1)
+            table.append(row)
+        accept = [i for i in range(compiled.n_states) if compiled.accept[i]]
+        return cls.from_table(compiled.alphabet, table,
+                              initial=compiled.initial, accept=accept,
+                              names=list(compiled.names))
+
+    def save(self, path):
+        serialize.save(self, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_compiled(serialize.load(path))
+
+    def get_accept_states(self):
+        return [self._view(i) for i in range(self._n) if self._is_accept(i)]
+
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = compile_dfa(self)
+        return self._compiled
+
+    def accepts(self, sequence):
+        return self.compile().accepts(sequence)
+
+    def enable_profiling(self):
+        """Count the traffic of `accepts` until disable_profiling.
+
+        Returns the Profile collecting the counts. Profiling replaces the
+        methods on this instance only, so it costs nothing when off.
+        """
+        self.disable_profiling()
+        profile = Profile(self)
+        self.accepts = profile.accepts
+        self.profile = profile
+        return profile
+
+    def disable_profiling(self):
+        """Stop profiling; returns the Profile, or None if there was none."""
+        profile = self.__dict__.pop('profile', None)
+        self.__dict__.pop('accepts', None)
+        return profile
+
+    def accepts_batch(self, sequences):
+        return self.compile().accepts_batch(sequences)
+
+    def symbol_classes(self):
+        return self.compile().symbol_classes()
+
+    def stream(self):
+        return self.compile().stream()
+
+    def to_dot(self, graph_name='dfa'):
+        """pydot graph of the states and transitions (needs pydot_ng)."""
+        import pydot_ng as pydot
+        dot_object = pydot.Dot(graph_name=graph_name, rankdir='LR')
+        dot_object.set_node_defaults(shape='circle')
+        for s in self.states:
+            dot_object.add_node(pydot.Node(
+                s.name, shape='doublecircle' if s.accept else 'circle'))
+        if self.initial_state is not None:
+            dot_object.add_node(pydot.Node('', shape='none'))
+            dot_object.add_edge(pydot.Edge('', self.initial_state.name))
+        for t in self.transitions:
+            label = t[2] if len(t) < 4 else '{0}/{1}'.format(t[2], t[3])
+            dot_object.add_edge(pydot.Edge(t[0].name, t[1].name,
+                                           label=label))
+        return dot_object
+
+    def equivalent(self, other):
+        return hopcroft_karp(self.compile(), other.compile()) is None
+
+    def counterexample(self, other):
+        """Shortest input accepted by exactly one of the DFAs, or None.
+
+        Found by the same union-find pass as `equivalent`. Returned as a
+        string when both alphabets are single characters.
+        """
+        word = hopcroft_karp(self.compile(), other.compile())
+        if word is not None and _single_chars(list(self.alphabet)
+                                              + list(other.alphabet)):
+            return ''.join(word)
+        return word
+
+    def sample(self, n, length, rng=None):
+        """`n` accepted inputs drawn uniformly at random.
+
+        `length` is a length or an iterable of lengths (a range, say), all
+        accepted inputs of those lengths being equally likely. `rng` seeds
+        or is a numpy.random.Generator. Inputs are strings when the
+        alphabet is single characters, symbol lists otherwise.
+        """
+        lengths = [length] if isinstance(length, int) else list(length)
+        compiled = self.compile()
+        sampler = self._sampler
+        if (sampler is None or sampler.compiled is not compiled
+                or sampler.max_length < max(lengths, default=0)):
+            from .sampling import Sampler
+            sampler = self._sampler = Sampler(
+                compiled, max(lengths, default=0))
+        return sampler.sample(n, lengths, rng,
+                              as_text=_single_chars(self.alphabet))
+
+    def count_accepted(self, n):
+        """Number of accepted inputs of length `n`."""
+        from .counting import count_accepted
+        return count_accepted(self.compile(), n)
+
+    def count_accepted_upto(self, n):
+        """Number of accepted inputs of length at most `n`."""
+        from .counting import count_accepted
+        return count_accepted(self.compile(), n, upto=True)
+
+    def density(self, n):
+        """Fraction of the inputs of length `n` that are accepted."""
+        return self.count_accepted(n) / len(self.alphabet) ** n
+
+    def intersection(self, other, lazy=False):
+        return product([self, other], OPERATIONS['intersection'], lazy)
+
+    def union(self, other, lazy=False):
+        return product([self, other], OPERATIONS['union'], lazy)
+
+    def difference(self, other, lazy=False):
+        return product([self, other], OPERATIONS['difference'], lazy)
+
+    def symmetric_difference(self, other, lazy=False):
+        return product([self, other], OPERATIONS['symmetric_difference'],
+                       lazy)
+
+    def accepts_bytes(self, data):
+        return self.compile().bytes_scanner().accepts(data)
+
+    def accepts_file(self, path):
+        return self.compile().bytes_scanner().accepts_file(path)
+
+    def _walk(self, sequence):
+        """steps() over ids: (from_id, symbol, to_id, transition index),
+        to_id and index being -1 for a missing transition."""
+        i = self._initial
+        if i < 0:
+            raise RuntimeError('{} has no initial state.'
+                               .format(self.__class__.__name__))
+        alphabet, symbol_ids = self.alphabet, self._symbol_ids
+        head, nxt, dst, sym = self._head, self._next, self._dst, self._sym
+        for s in sequence:
+            if s not in alphabet:
+                raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                                 .format(s, self.__class__.__name__))
+            want = symbol_ids.get(s, -1)
+            e = head[i]
+            while e >= 0 and sym[e] != want:
+                e = nxt[e]
+            if e < 0:
+                yield i, s, -1, -1
+                return
+            yield i, s, dst[e], e
+            i = dst[e]
+
+    def steps(self, sequence):
+        """Lazily yield (from_state, symbol, to_state, output) per symbol.
+
+        `output` is None for transitions without one. A symbol without a
+        transition yields a step to None and ends the run.
+        """
+        out, pool = self._outputs()
+        view = self._view
+        for i, s, j, e in self._walk(sequence):
+            if j < 0:
+                yield view(i), s, None, None
+            else:
+                yield (view(i), s, view(j),
+                       None if out is None else pool[out[e]])
+
+    def _run(self, sequence, trace):
+        if len(self._dst) == 0 or self._n == 0:
+            raise RuntimeError('{} has no states or transitions.'
+                               .format(self.__class__.__name__))
+        if self._initial < 0:
+            raise RuntimeError('{} has no initial state.'
+                               .format(self.__class__.__name__))
+        if not any(self._accept):
+            raise RuntimeError('{} has no accept states.'
+                               .format(self.__class__.__name__))
+        if trace is None:
+            trace = self.trace
+        # The null trace ignores the steps, so no views are built for it.
+        report = trace is not NULL_TRACE
+        out, pool = self._outputs()
+        view = self._view
+        trace.start(self, sequence)
+        cur = self._initial
+        output = []
+        for i, symbol, j, e in self._walk(sequence):
+            if j < 0:
+                if report:
+                    trace.step(view(i), symbol, None, None)
+                return False, output
+            out_symbol = None if out is None else pool[out[e]]
+            if report:
+                trace.step(view(i), symbol, view(j), out_symbol)
+            if out_symbol is not None:
+                output.append(out_symbol)
+            cur = j
+        accepted = self._is_accept(cur)
+        trace.end(view(cur), accepted)
+        return accepted, output
+
+    def process_sequence(self, sequence, verbose=False, trace=None):
+        """Run `sequence`, reporting each step to `trace` (see tracing).
+
+        `verbose` prints the steps, like trace=PrintTrace().
+        """
+        if verbose and trace is None:
+            trace = PrintTrace()
+        return self._run(sequence, trace)[0]
+
+    def get_state(self, name):
+        i = self._find(name)
+        return self._view(i) if i >= 0 else None
+
+    def print_matrix(self):
+        rows = len(self.states)
+        cols = len(self.alphabet)
+        mtx = []
+        for r in rows:
+            sv = [self.states[r].name]
+            for c in cols:
+                sv.append()
+
+    def remove_unreachable_states(self):
+        if self._initial < 0:
+            raise RuntimeError('{} has no initial state.'
+                               .format(self.__class__.__name__))
+        forward, _ = adjacency(self._n, self._src, self._dst)
+        _, order = mark_from(forward, [self._initial])
+        self._keep_states(order)
+
+    def remove_useless_states(self):
+        _, reverse = adjacency(self._n, self._src, self._dst)
+        useful, order = mark_from(reverse, [i for i in range(self._n)
+                                            if self._is_accept(i)])
+        # The initial state stays even when no accept state is reachable.
+        if self._initial >= 0 and not useful[self._initial]:
+            order.append(self._initial)
+        self._keep_states(order)
+
+    def _keep_states(self, order):
+        """Keep the states with ids `order`, renumbered in that order."""
+        old = copy.copy(self)
+        self._clear()
+        new_id = array('i', [-1]) * old._n
+        for i in order:
+            new_id[i] = self._n
+            self.add_state(old._name(i), initial=i == old._initial,
+                           accept=old._is_accept(i))
+        for e in old._edge_order():
+            from_, to_ = new_id[old._src[e]], new_id[old._dst[e]]
+            if from_ >= 0 and to_ >= 0:
+                self._add_edge(from_, to_, *old._label(e))
+
+    def _detach(self):
+        """The states as DFAState objects, and the initial one or None."""
+        states = [DFAState(self._name(i), i == self._initial,
+                           self._is_accept(i)) for i in range(self._n)]
+        for e in self._edge_order():
+            states[self._src[e]].transitions.append(
+                (states[self._dst[e]],) + self._label(e))
+        initial = states[self._initial] if self._initial >= 0 else None
+        return states, initial
+
+    def _attach(self, states, initial):
+        """Replace the states by the DFAState objects `states`."""
+        self._clear()
+        ids = {}
+        for s in states:
+            ids[id(s)] = self._n
+            self.add_state(s.name, initial=s is initial, accept=s.accept)
+        for s in states:
+            for t in s.transitions:
+                to_ = ids.get(id(t[0]))
+                if to_ is not None:
+                    self._add_edge(ids[id(s)], to_, *t[1:])
+
+    def trim(self):
+        """Copy without unreachable or useless states.
+
+        Returns the trimmed copy, of the same class as this automaton, and a
+        dict mapping each removed state name to 'unreachable' or 'useless'.
+        The initial state is always kept.
+        """
+        if self._initial < 0:
+            raise RuntimeError('{} has no initial state.'
+                               .format(self.__class__.__name__))
+        forward, reverse = adjacency(self._n, self._src, self._dst)
+        start = self._initial
+        reach, _ = mark_from(forward, [start])
+        useful, _ = mark_from(reverse, [i for i in range(self._n)
+                                        if self._is_accept(i)])
+        useful[start] = 1
+        removed = {}
+        kept = []
+        for i in range(self._n):
+            if not reach[i]:
+                removed[self._name(i)] = 'unreachable'
+            elif not useful[i]:
+                removed[self._name(i)] = 'useless'
+            else:
+                kept.append(i)
+        trimmed = self._blank()
+        copy_of = array('i', [-1]) * self._n
+        for i in kept:
+            copy_of[i] = trimmed._n
+            trimmed.add_state(self._name(i), initial=i == start,
+                              accept=self._is_accept(i))
+        for i in kept:
+            for e in self._edges_from(i):
+                to_ = copy_of[self._dst[e]]
+                if to_ >= 0:
+                    trimmed._add_edge(copy_of[i], to_, *self._label(e))
+        return trimmed, removed
+
+    def _blank(self):
+        """Automaton of the same class and alphabet, with no states."""
+        return type(self)(self.alphabet)
+
+    def state_label(self, state):
+        """What minimization must preserve for `state` (None is the sink)."""
+        return state is not None and state.accept
+
+    def minimize_hopcroft(self):
+        compiled = self.compile().compress()
+        labels = [self.state_label(s) for s in self.states]
+        labels.append(self.state_label(None))
+        blocks = hopcroft(compiled, labels)
+        old = copy.copy(self)
+        self._clear()
+        new_of = array('i', [-1]) * old._n
+        for block in blocks:
+            self.add_state(','.join([old._name(i) for i in block]),
+                           initial=old._initial in block,
+                           accept=old._is_accept(block[0]))
+            for i in block:
+                new_of[i] = self._n - 1
+        for from_, block in enumerate(blocks):
+            seen = set()
+            for e in old._edges_from(block[0]):
+                to_ = new_of[old._dst[e]]
+                # Transitions into the dead block are dropped.
+                if to_ < 0 or old._sym[e] in seen:
+                    continue
+                seen.add(old._sym[e])
+                self._add_edge(from_, to_, *old._label(e))
+
+    def minimize(self, method='pairs'):
+        if method == 'hopcroft':
+            self.minimize_hopcroft()
+            return
+        if method != 'pairs':
+            raise ValueError('unknown minimization method {0} for {1}.'
+                             .format(method, self.__class__.__name__))
+        self.remove_unreachable_states()
+        self.remove_useless_states()
+
+        # This method works on DFAState objects, put back into the arrays
+        # at the end.
+        states, initial = self._detach()
+        by_name = {}
+        for s in states:
+            by_name.setdefault(s.name, s)
+        accept_states = [s for s in states if s.accept]
+
+        def add_transition(from_name, to_name, symbol):
+            from_ = by_name.get(from_name)
+            to_ = by_name.get(to_name)
+            if from_ is None:
+                raise ValueError('state {0} not in {1}.'
+                                 .format(from_name, self.__class__.__name__))
+            if to_ is None:
+                raise ValueError('state {0} not in {1}.'
+                                 .format(to_name, self.__class__.__name__))
+            from_.add_transition(to_, symbol)
+
+        pairs = []
+        # State pairs
+        for i in range(len(states)):
+            for j in range(i, len(states)):
+                if i != j and (states[i], states[j]) not in pairs:
+                    pairs.append(set([states[i], states[j]]))
+        not_equiv = []
+        for i, (q_a, q_b) in enumerate(pairs):
+            if ((q_a in accept_states and q_b not in accept_states)
+                    or (q_b in accept_states and q_a not in accept_states)):
+                not_equiv.append(i)
+        equiv = []
+        not_chkd = [i for i in range(len(pairs)) if i not in not_equiv]
+
+        ni = 0
+        while len(not_chkd) != 0:
+            try:
+                q_a, q_b = pairs[not_chkd[ni]]
+            except IndexError:
+                ni = 0
+                q_a, q_b = pairs[not_chkd[ni]]
+            cur_pair = (q_a, q_b)
+            eq_chk = []
+            eq_chk2 = []
+            for t_a, s_a in q_a.transitions:
+                for t_b, s_b in q_b.transitions:
+                    if s_a == s_b:
+                        cur_to_pair = set([t_a, t_b])
+                        break
+                if t_a == t_b:
+                    eq_chk.append(True)
+                else:
+                    eq_chk.append(False)
+                if cur_to_pair in [pairs[n] for n in not_equiv]:
+                    not_equiv.append(not_chkd[ni])
+                    not_chkd.remove(not_chkd[ni])
+                    eq_chk2.append(False)
+                    break
+                elif cur_to_pair in [pairs[e] for e in equiv]:
+                    eq_chk2.append(True)
+            if all(eq_chk):
+                equiv.append(not_chkd[ni])
+                not_chkd.remove(not_chkd[ni])
+            elif all(eq_chk2):
+                equiv.append(not_chkd[ni])
+                not_chkd.remove(not_chkd[ni])
+            else:
+                ni += 1
+
+        equiv_pairs = [pairs[e] for e in equiv]
+        new_states = []
+        for i in range(len(equiv_pairs)):
+            cur_pair_i = equiv_pairs[i]
+            new_state = cur_pair_i
+            for j in range(len(equiv_pairs)):
+                if i != j:
+                    cur_pair_j = equiv_pairs[j]
+                    if len(cur_pair_i.intersection(cur_pair_j)) != 0:
+                        new_state = new_state.union(cur_pair_j)
+            if new_state not in new_states:
+                new_states.append(new_state)
+
+        # Create new states
+        for ns in new_states:
+            new_name = ','.join([s.name for s in ns])
+            is_initial = True if any([s.initial for s in ns]) else False
+            is_accept = True if any([s.accept for s in ns]) else False
+            for s in ns:
+                if s.initial:
+                    initial = None
+                states.remove(s)
+                if by_name.get(s.name) is s:
+                    del by_name[s.name]
+            if is_initial and initial is not None:
+                raise ValueError('{} already has an initial state.'
+                                 .format(self.__class__.__name__))
+            state = DFAState(new_name, is_initial, is_accept)
+            if is_initial:
+                initial = state
+            states.append(state)
+            by_name.setdefault(new_name, state)
+
+        # Transitions
+        for ns in new_states:
+            transitions = set()
+            new_name = ','.join([s.name for s in ns])
+            for s in ns:
+                for to_, symbol in s.transitions:
+                    ck = []
+                    for ns2 in new_states:
+                        new_name2 = ','.join([s.name for s in ns2])
+                        if to_.name in new_name2 and symbol not in [s for t, s in transitions]:
+                            transitions.add((new_name2, symbol))
+                        elif to_.name not in new_name2 and symbol not in [s for t, s in transitions]:
+                            ck.append(True)
+                    if all(ck) and len(ck) == len(new_states):
+                        transitions.add((to_.name, symbol))
+
+            for to_, symbol in transitions:
+                add_transition(new_name, to_, symbol)
+
+        ns_names = [','.join([s.name for s in ns]) for ns in new_states]
+        for s in states:
+            transitions = set()
+            if s.name in ns_names:
+                continue
+            for to_, symbol in s.transitions:
+                ck = []
+                for ns2 in new_states:
+                    new_name2 = ','.join([s.name for s in ns2])
+                    if to_.name in new_name2 and symbol not in [s for t, s in transitions]:
+                        transitions.add((new_name2, symbol))
+                    elif to_.name not in new_name2 and symbol not in [s for t, s in transitions]:
+                        ck.append(True)
+                if all(ck) and len(ck) == len(new_states):
+                    transitions.add((to_.name, symbol))
+            # remove transitions
+            s.transitions = []
+            for to_, symbol in transitions:
+                add_transition(s.name, to_, symbol)
+
+        self._attach(states, initial)
+
+
+class MealyMachine(DFA):
+    state_view = MealyStateView
+    _edge_columns = DFA._edge_columns + ('_out',)
+
+    def __init__(self, alphabet=None, out_alphabet=None):
+        """"""
+        super(MealyMachine, self).__init__(alphabet)
+        self.out_alphabet = out_alphabet
+        # Transition outputs by id, the empty one first.
+        self._pool = ['']
+        self._pool_ids = {'': 0}
+
+    def _clear_transitions(self):
+        super(MealyMachine, self)._clear_transitions()
+        # Transition e writes _pool[_out[e]].
+        self._out = array('i')
+
+    def _out_id(self, out_symbol):
+        out = self._pool_ids.get(out_symbol)
+        if out is None:
+            out = self._pool_ids[out_symbol] = len(self._pool)
+            self._pool.append(out_symbol)
+        return out
+
+    def _add_edge(self, i, j, symbol, out_symbol=''):
+        super(MealyMachine, self)._add_edge(i, j, symbol)
+        self._out.append(self._out_id(out_symbol))
+
+    def _put_edge(self, e, j, symbol, out_symbol=''):
+        super(MealyMachine, self)._put_edge(e, j, symbol)
+        self._out[e] = self._out_id(out_symbol)
+
+    def _label(self, e):
+        return self._symbols[self._sym[e]], self._pool[self._out[e]]
+
+    def _blank(self):
+        return type(self)(self.alphabet, self.out_alphabet)
+
+    def _outputs(self):
+        return self._out, self._pool
+
+    def add_transition(self, from_name, to_name, symbol, out_symbol):
+        if len(self.alphabet) == 0:
+            raise RuntimeError('{} without alphabet.'
+                               .format(self.__class__.__name__))
+        if len(self.out_alphabet) == 0:
+            raise RuntimeError('{} without out alphabet.'
+                               .format(self.__class__.__name__))
+        if symbol not in self.alphabet:
+            raise ValueError('transition symbol not in {} alphabet.'
+                             .format(self.__class__.__name__))
+        for out_s in out_symbol:
+            if out_s not in self.out_alphabet:
+                raise ValueError('transition out symbol {0} not in {1} out '
+                                 'alphabet.'
+                                 .format(out_s, self.__class__.__name__))
+        from_ = self._find(from_name)
+        to_ = self._find(to_name)
+        if from_ < 0:
+            raise ValueError('state {0} not in {1}.'
+                             .format(from_name, self.__class__.__name__))
+        if to_ < 0:
+            raise ValueError('state {0} not in {1}.'
+                             .format(to_name, self.__class__.__name__))
+        self._add_edge(from_, to_, symbol, out_symbol)
+
+    @classmethod
+    def from_compiled(cls, compiled):
+        """Rebuild a Mealy machine from a compiled table.
+
+        The out alphabet is not part of the table, so it becomes the
+        characters the outputs are made of, in order of first use.
+        """
+        if not isinstance(compiled, CompiledMealy):
+            raise ValueError('{} needs a compiled table with outputs.'
+                             .format(cls.__name__))
+        out_alphabet = []
+        for out in compiled.pool:
+            out_alphabet.extend(c for c in out if c not in out_alphabet)
+        machine = cls(list(compiled.alphabet), out_alphabet)
+        if len(machine.alphabet) == 0:
+            raise RuntimeError('{} without alphabet.'.format(cls.__name__))
+        for q in range(compiled.n_states):
+            machine.add_state(compiled.names[q], initial=q == compiled.initial,
+                              accept=compiled.accept[q] == 1)
+        k = compiled.n_symbols
+        sink = compiled.sink * k
+        for q in range(compiled.n_states):
+            for s in compiled.alphabet:
+                cell = q * k + compiled.symbol_index[s]
+                if compiled.table[cell] != sink:
+                    machine._add_edge(q, compiled.table[cell] // k, s,
+                                      compiled.pool[compiled.outputs[cell]])
+        return machine
+
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = compile_mealy(self)
+        return self._compiled
+
+    def transduce(self, sequence, out=None):
+        return self.compile().transduce(sequence, out)
+
+    def enable_profiling(self):
+        profile = super(MealyMachine, self).enable_profiling()
+        self.transduce = profile.transduce
+        return profile
+
+    def disable_profiling(self):
+        self.__dict__.pop('transduce', None)
+        return super(MealyMachine, self).disable_profiling()
+
+    def compose(self, other, minimize=True):
+        """Single machine feeding the output of `self` into `other`.
+
+        States are the reachable pairs of states; a transition runs `other`
+        over the whole, possibly empty or multi-character, output of `self`
+        and emits what `other` writes meanwhile. The pair accepts when both
+        components do, and it has no transition where `other` would get
+        stuck inside that output. States are named q_<i> in the order they
+        are reached, as the component names joined together could collide.
+        The result is minimized unless asked not to be; minimization keeps
+        the states that can no longer accept, so outputs written before a
+        rejection are unchanged. A composition that accepts nothing has no
+        accept states, which process_sequence refuses as for any machine,
+        but transduce still runs it.
+        """
+        if self.initial_state is None or other.initial_state is None:
+            raise RuntimeError('{} has no initial state.'
+                               .format(self.__class__.__name__))
+        a, b = self.compile(), other.compile()
+        k, m = a.n_symbols, b.n_symbols
+
+        runs = {}
+
+        def run(q, word):
+            # `other` from row offset q over word: (row offset, output).
+            key = (q, word)
+            if key not in runs:
+                out = []
+                for c in word:
+                    col = b.symbol_index.get(c)
+                    nxt = b.sink * m if col is None else b.table[q + col]
+                    if nxt == b.sink * m:
+                        runs[key] = None
+                        break
+                    out.append(b.pool[b.outputs[q + col]])
+                    q = nxt
+                else:
+                    runs[key] = q, ''.join(out)
+            return runs[key]
+
+        composed = MealyMachine(list(self.alphabet),
+                                list(other.out_alphabet))
+        start = (a.initial * k, b.initial * m)
+        index = {}
+        order = []
+
+        def add(pair):
+            index[pair] = len(order)
+            order.append(pair)
+            composed.add_state(initial=pair == start,
+                               accept=(a.accept[pair[0] // k] == 1
+                                       and b.accept[pair[1] // m] == 1))
+
+        add(start)
+        for p, q in order:
+            for s in a.alphabet:
+                cell = p + a.symbol_index[s]
+                if a.table[cell] == a.sink * k:
+                    continue
+                target = run(q, a.pool[a.outputs[cell]])
+                if target is None:
+                    continue
+                pair = (a.table[cell], target[0])
+                if pair not in index:
+                    add(pair)
+                composed._add_edge(index[(p, q)], index[pair], s, target[1])
+        if minimize:
+            composed.minimize(method='hopcroft')
+        return composed
+
+    def state_label(self, state):
+        # No state shares the sink's label: a state that never accepts may
+        # still write output on the way to rejecting, so it is kept.
+        if state is None:
+            return None
+        outputs = {}
+        for to_, symbol, out_symbol in state.transitions:
+            outputs.setdefault(symbol, out_symbol)
+        return state.accept, tuple(sorted(outputs.items()))
+
+    def process_sequence(self, sequence, verbose=False, trace=None):
+        if verbose and trace is None:
+            trace = PrintTrace()
+        accepted, output = self._run(sequence, trace)
+        return accepted, ''.join(output)
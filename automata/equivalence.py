@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from collections import deque
+
+
+def _mover(compiled):
+    k = compiled.n_symbols
+    table = compiled.table
+    sink = compiled.sink
+    cols = compiled.symbol_index
+
+    def move(q, symbol):
+        col = cols.get(symbol)
+        if col is None:
+            return sink
+        return table[q * k + col] // k
+    return move
+
+
+def _alphabet(a, b):
+    known = set(a.alphabet)
+    return list(a.alphabet) + [s for s in b.alphabet if s not in known]
+
+
+def hopcroft_karp(a, b):
+    """Shortest symbol list accepted by exactly one of compiled DFAs `a`
+    and `b`, or None when they accept the same language.
+
+    Union-find over the states of both automata (sinks included), merging
+    the pair of targets on every symbol starting from the initial states;
+    near-linear in the number of states times the alphabet size. Pairs are
+    checked breadth-first, so the first one whose accept flags differ is
+    reached by a shortest distinguishing input.
+    """
+    offset = a.n_states + 1
+    parent = list(range(offset + b.n_states + 1))
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    move_a, move_b = _mover(a), _mover(b)
+    alphabet = _alphabet(a, b)
+    parent[offset + b.initial] = a.initial
+    start = (a.initial, b.initial)
+    # Only merged pairs are queued, each remembering how it was reached.
+    back = {start: None}
+    pending = deque([start])
+    while pending:
+        pair = pending.popleft()
+        p, q = pair
+        if a.accept[p] != b.accept[q]:
+            word = []
+            while back[pair] is not None:
+                pair, s = back[pair]
+                word.append(s)
+            word.reverse()
+            return word
+        for s in alphabet:
+            p2, q2 = move_a(p, s), move_b(q, s)
+            r1, r2 = find(p2), find(offset + q2)
+            if r1 != r2:
+                parent[r2] = r1
+                back[(p2, q2)] = (pair, s)
+                pending.append((p2, q2))
+    return None
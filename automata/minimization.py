@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+
+def adjacency(n_states, sources, targets):
+    """Forward and reverse successor lists of `n_states` state ids, from
+    the transitions sources[e] -> targets[e]."""
+    forward = [[] for _ in range(n_states)]
+    reverse = [[] for _ in range(n_states)]
+    for i, j in zip(sources, targets):
+        forward[i].append(j)
+        reverse[j].append(i)
+    return forward, reverse
+
+
+def mark_from(graph, sources):
+    """Breadth-first search from `sources`.
+
+    Returns a bytearray marking the visited indices and the indices in
+    visiting order.
+    """
+    seen = bytearray(len(graph))
+    queue = []
+    for i in sources:
+        if not seen[i]:
+            seen[i] = 1
+            queue.append(i)
+    for i in queue:
+        for j in graph[i]:
+            if not seen[j]:
+                seen[j] = 1
+                queue.append(j)
+    return seen, queue
+
+
+def reachable(compiled):
+    """Indices of the states reachable from the initial one, sink excluded."""
+    k = compiled.n_symbols
+    table = compiled.table
+    sink = compiled.sink
+    seen = bytearray(compiled.n_states + 1)
+    seen[sink] = 1
+    seen[compiled.initial] = 1
+    order = [compiled.initial]
+    for q in order:
+        for off in table[q * k:(q + 1) * k]:
+            t = off // k
+            if not seen[t]:
+                seen[t] = 1
+                order.append(t)
+    return order
+
+
+def hopcroft(compiled, labels):
+    """Partition the reachable states of `compiled` into equivalence blocks.
+
+    `labels` holds one hashable per state, sink included, and states with
+    different labels are never merged (the accept flag for a DFA). Missing
+    transitions go to the sink, so states equivalent to it are dropped,
+    unless the initial state is one of them. Blocks come back as sorted
+    lists of state indices, ordered by their smallest member.
+    """
+    k = compiled.n_symbols
+    table = compiled.table
+    sink = compiled.sink
+    states = reachable(compiled)
+    states.append(sink)
+
+    # Reverse transition index: inverse[c][t] lists the q with q -c-> t.
+    inverse = [{} for _ in range(k)]
+    for q in states:
+        row = table[q * k:(q + 1) * k]
+        for c in range(k):
+            inverse[c].setdefault(row[c] // k, []).append(q)
+
+    groups = {}
+    for q in states:
+        groups.setdefault(labels[q], []).append(q)
+    blocks = [set(g) for g in groups.values()]
+    block_of = {}
+    for b, members in enumerate(blocks):
+        for q in members:
+            block_of[q] = b
+    largest = max(range(len(blocks)), key=lambda b: len(blocks[b]))
+    work = set(b for b in range(len(blocks)) if b != largest)
+
+    while work:
+        splitter = list(blocks[work.pop()])
+        for c in range(k):
+            pre = inverse[c]
+            touched = {}
+            for t in splitter:
+                for q in pre.get(t, ()):
+                    touched.setdefault(block_of[q], []).append(q)
+            for b, qs in touched.items():
+                if len(qs) == len(blocks[b]):
+                    continue
+                new = set(qs)
+                blocks[b] -= new
+                z = len(blocks)
+                blocks.append(new)
+                for q in new:
+                    block_of[q] = z
+                if b in work or len(new) <= len(blocks[b]):
+                    work.add(z)
+                else:
+                    work.add(b)
+
+    dead = block_of[sink]
+    if block_of[compiled.initial] == dead:
+        return [[compiled.initial]]
+    result = [sorted(q for q in members if q != sink)
+              for b, members in enumerate(blocks) if b != dead]
+    result.sort(key=lambda block: block[0])
+    return result
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+from .dfa import DFA, DFAState
+
+
+class NFAState(DFAState):
+    __slots__ = ()
+
+    def add_transition(self, to_, symbol=None):
+        self.transitions.append((to_, symbol))
+
+
+class NFA(object):
+    def __init__(self, alphabet=None):
+        """Nondeterministic automaton; a None symbol is an epsilon move."""
+        if alphabet is None:
+            alphabet = []
+        self.alphabet = alphabet
+        self.initial_state = None
+        self.states = []
+        self.transitions = []
+        self._by_name = {}
+        self._matcher = None
+
+    def add_state(self, name=None, initial=False, accept=False):
+        if initial and self.initial_state is not None:
+            raise ValueError('{} already has an initial state.'
+                             .format(self.__class__.__name__))
+        if name is None:
+            last_num = len(self.states)
+            name = 'q_{}'.format(last_num)
+        state = NFAState(name, initial, accept)
+        if initial:
+            self.initial_state = state
+        self.states.append(state)
+        self._by_name.setdefault(name, state)
+        self._matcher = None
+
+    def add_transition(self, from_name, to_name, symbol=None):
+        if len(self.alphabet) == 0:
+            raise RuntimeError('{} without alphabet.'
+                               .format(self.__class__.__name__))
+        if symbol is not None and symbol not in self.alphabet:
+            raise ValueError('transition symbol not in {} alphabet.'
+                             .format(self.__class__.__name__))
+        from_ = self.get_state(from_name)
+        to_ = self.get_state(to_name)
+        if from_ is None:
+            raise ValueError('state {0} not in {1}.'
+                             .format(from_name, self.__class__.__name__))
+        if to_ is None:
+            raise ValueError('state {0} not in {1}.'
+                             .format(to_name, self.__class__.__name__))
+        from_.add_transition(to_, symbol)
+        self.transitions.append((from_, to_, symbol))
+        self._matcher = None
+
+    def get_state(self, name):
+        return self._by_name.get(name)
+
+    def get_accept_states(self):
+        return [s for s in self.states if s.accept]
+
+    def matcher(self, max_states=1024):
+        return LazyDFA(self, max_states=max_states)
+
+    def accepts(self, sequence):
+        if self._matcher is None:
+            self._matcher = self.matcher()
+        return self._matcher.accepts(sequence)
+
+    def determinize(self):
+        """Equivalent DFA by full subset construction.
+
+        Reachable subsets become states q_0, q_1, ... in discovery order and
+        the empty subset is left out as the implicit sink.
+        """
+        matcher = LazyDFA(self, max_states=None)
+        start = matcher.start()
+        order = [start]
+        seen = {start}
+        edges = []
+        for cur in order:
+            for s in self.alphabet:
+                nxt = matcher.step(cur, s)
+                if nxt == LazyDFA.DEAD:
+                    continue
+                if nxt not in seen:
+                    seen.add(nxt)
+                    order.append(nxt)
+                edges.append((cur, nxt, s))
+        names = {d: 'q_{}'.format(i) for i, d in enumerate(order)}
+        return DFA.from_edges(
+            self.alphabet, [names[d] for d in order],
+            [(names[f], names[t], s) for f, t, s in edges],
+            accept=[names[d] for d in order if matcher.accept[d]])
+
+
+class LazyDFA(object):
+    DEAD = -1
+
+    def __init__(self, nfa, max_states=1024, thrash_ratio=10):
+        """Matcher that determinizes `nfa` on the fly.
+
+        DFA states (epsilon-closed sets of NFA states) are created the first
+        time a transition reaches them and kept in a cache of at most
+        `max_states` entries, None meaning unbounded. A full cache is
+        flushed; when that happens again before `thrash_ratio` symbols per
+        cached state have been read, the rest of the input is matched by
+        plain set simulation instead.
+        """
+        if nfa.initial_state is None:
+            raise RuntimeError('{} has no initial state.'
+                               .format(nfa.__class__.__name__))
+        index = {id(s): i for i, s in enumerate(nfa.states)}
+        self.alphabet = set(nfa.alphabet)
+        self.eps = [[] for _ in nfa.states]
+        self.moves = [{} for _ in nfa.states]
+        for i, state in enumerate(nfa.states):
+            for to_, symbol in state.transitions:
+                if symbol is None:
+                    self.eps[i].append(index[id(to_)])
+                else:
+                    self.moves[i].setdefault(symbol, []).append(
+                        index[id(to_)])
+        self.final = frozenset(i for i, s in enumerate(nfa.states)
+                               if s.accept)
+        self.initial = self.closure([index[id(nfa.initial_state)]])
+        self.max_states = max_states
+        self.thrash_ratio = thrash_ratio
+        self.flushes = 0
+        self.fallbacks = 0
+        self._read = 0
+        self._flush_mark = 0
+        self.flush()
+
+    def __repr__(self):
+        return ('{0}(cached={1}, flushes={2}, fallbacks={3})'
+                .format(self.__class__.__name__, len(self.sets), self.flushes,
+                        self.fallbacks))
+
+    def flush(self):
+        self.ids = {}
+        self.sets = []
+        self.rows = []
+        self.accept = []
+
+    def closure(self, states):
+        eps = self.eps
+        stack = list(states)
+        seen = set(stack)
+        while stack:
+            for t in eps[stack.pop()]:
+                if t not in seen:
+                    seen.add(t)
+                    stack.append(t)
+        return frozenset(seen)
+
+    def move(self, subset, symbol):
+        if symbol not in self.alphabet:
+            raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                             .format(symbol, self.__class__.__name__))
+        targets = []
+        moves = self.moves
+        for q in subset:
+            targets.extend(moves[q].get(symbol, ()))
+        return self.closure(targets)
+
+    def state_id(self, subset):
+        d = self.ids.get(subset)
+        if d is None:
+            if (self.max_states is not None
+                    and len(self.sets) >= self.max_states):
+                self.flush()
+                self.flushes += 1
+            d = len(self.sets)
+            self.ids[subset] = d
+            self.sets.append(subset)
+            self.rows.append({})
+            self.accept.append(not self.final.isdisjoint(subset))
+        return d
+
+    def start(self):
+        return self.state_id(self.initial)
+
+    def step(self, d, symbol):
+        """Target of DFA state `d` on `symbol`, building it when needed.
+
+        Ids are only valid until the next flush.
+        """
+        nxt = self.rows[d].get(symbol)
+        if nxt is None:
+            subset = self.move(self.sets[d], symbol)
+            if not subset:
+                nxt = self.rows[d][symbol] = self.DEAD
+            else:
+                flushes = self.flushes
+                nxt = self.state_id(subset)
+                if self.flushes == flushes:
+                    self.rows[d][symbol] = nxt
+        return nxt
+
+    def accepts(self, sequence):
+        cur = self.start()
+        flushes = self.flushes
+        rows = self.rows
+        dead = self.DEAD
+        base = self._read
+        i = -1
+        it = iter(sequence)
+        for i, s in enumerate(it):
+            nxt = rows[cur].get(s)
+            if nxt is None:
+                nxt = self.step(cur, s)
+                if self.flushes != flushes and nxt != dead:
+                    flushes = self.flushes
+                    rows = self.rows
+                    run = base + i - self._flush_mark
+                    self._flush_mark = base + i
+                    if run < self.thrash_ratio * self.max_states:
+                        self._read = base + i + 1
+                        return self._simulate(self.sets[nxt], it)
+            if nxt == dead:
+                self._read = base + i + 1
+                return False
+            cur = nxt
+        self._read = base + i + 1
+        return self.accept[cur]
+
+    def _simulate(self, subset, rest):
+        self.fallbacks += 1
+        for s in rest:
+            subset = self.move(subset, s)
+            if not subset:
+                return False
+        return not self.final.isdisjoint(subset)
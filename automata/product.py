@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import operator
+
+OPERATIONS = {
+    'intersection': lambda a, b: a and b,
+    'union': lambda a, b: a or b,
+    'difference': lambda a, b: a and not b,
+    'symmetric_difference': operator.xor,
+}
+
+
+class LazyProduct(object):
+    DEAD = -1
+
+    def __init__(self, dfas, predicate=None):
+        """Product of several DFAs whose states are built on demand.
+
+        A product state is the tuple of component state indices (the sink
+        index included) and is only created once a transition reaches it.
+        `predicate` gets one accept flag per component and decides whether
+        the product accepts; it defaults to requiring all of them. The
+        alphabet is the union of the component alphabets, a component
+        moving to its sink on symbols it does not know.
+        """
+        dfas = list(dfas)
+        self.dfa_class = type(dfas[0])
+        self.compiled = [d.compile() for d in dfas]
+        if predicate is None:
+            predicate = all_accept
+        self.predicate = predicate
+        self.alphabet = []
+        for c in self.compiled:
+            self.alphabet.extend(s for s in c.alphabet
+                                 if s not in self.alphabet)
+        self._symbols = set(self.alphabet)
+        sinks = tuple(c.sink for c in self.compiled)
+        self._dead = sinks if not predicate(*[False] * len(sinks)) else None
+        self.ids = {}
+        self.tuples = []
+        self.rows = []
+        self.flags = []
+        self.accept = []
+        self.initial = self.state_id(tuple(c.initial for c in self.compiled))
+
+    def __repr__(self):
+        return ('{0}(components={1}, states={2})'
+                .format(self.__class__.__name__, len(self.compiled),
+                        len(self.tuples)))
+
+    def state_id(self, states):
+        if states == self._dead:
+            return self.DEAD
+        d = self.ids.get(states)
+        if d is None:
+            d = len(self.tuples)
+            self.ids[states] = d
+            self.tuples.append(states)
+            self.rows.append({})
+            flags = tuple(c.accept[q] == 1
+                          for c, q in zip(self.compiled, states))
+            self.flags.append(flags)
+            self.accept.append(bool(self.predicate(*flags)))
+        return d
+
+    def step(self, d, symbol):
+        nxt = self.rows[d].get(symbol)
+        if nxt is None:
+            if symbol not in self._symbols:
+                raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                                 .format(symbol, self.__class__.__name__))
+            states = []
+            for c, q in zip(self.compiled, self.tuples[d]):
+                col = c.symbol_index.get(symbol)
+                if col is None:
+                    states.append(c.sink)
+                else:
+                    states.append(c.table[q * c.n_symbols + col]
+                                  // c.n_symbols)
+            nxt = self.rows[d][symbol] = self.state_id(tuple(states))
+        return nxt
+
+    def _walk(self, sequence):
+        rows = self.rows
+        dead = self.DEAD
+        cur = self.initial
+        for s in sequence:
+            nxt = rows[cur].get(s)
+            if nxt is None:
+                nxt = self.step(cur, s)
+            if nxt == dead:
+                return dead
+            cur = nxt
+        return cur
+
+    def accepts(self, sequence):
+        cur = self._walk(sequence)
+        return cur != self.DEAD and self.accept[cur]
+
+    def components(self, sequence):
+        """One accept flag per component DFA, from a single pass."""
+        cur = self._walk(sequence)
+        if cur == self.DEAD:
+            return (False,) * len(self.compiled)
+        return self.flags[cur]
+
+    def materialize(self):
+        """Explore every reachable product state and return it as a DFA.
+
+        States are named q_<i> in the order they are reached, as component
+        names joined together could collide.
+        """
+        dfa = self.dfa_class(list(self.alphabet))
+        index = {self.initial: 0}
+        order = [self.initial]
+        dfa.add_state(initial=True, accept=self.accept[self.initial])
+        for cur in order:
+            for s in self.alphabet:
+                nxt = self.step(cur, s)
+                if nxt == self.DEAD:
+                    continue
+                if nxt not in index:
+                    index[nxt] = len(order)
+                    order.append(nxt)
+                    dfa.add_state(accept=self.accept[nxt])
+                dfa._add_edge(index[cur], index[nxt], s)
+        return dfa
+
+
+def all_accept(*flags):
+    return all(flags)
+
+
+def product(dfas, predicate=None, lazy=False):
+    lp = LazyProduct(dfas, predicate)
+    return lp if lazy else lp.materialize()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import json
+from array import array
+from collections import Counter
+
+MISSING_TRANSITION = 'missing_transition'
+NOT_ACCEPTING = 'not_accepting'
+ACCEPT = 'accept'
+
+
+class Profile(object):
+    def __init__(self, automaton):
+        """Traffic counters for a DFA or MealyMachine.
+
+        While installed (see DFA.enable_profiling) the automaton's
+        `accepts` and, for Mealy machines, `transduce` run through this
+        object, which counts the hits of every table cell, the inputs by
+        outcome and length, and the states the inputs start from. State
+        visits are derived from those when exported. Counts survive
+        changes to the automaton: they are folded by state name whenever
+        its compiled table is rebuilt.
+        """
+        self.automaton = automaton
+        self.compiled = None
+        self.reset()
+
+    def __repr__(self):
+        return '{0}(runs={1})'.format(self.__class__.__name__,
+                                      sum(self.outcomes.values()))
+
+    def reset(self):
+        self.compiled = None
+        self.hits = None
+        self.starts = None
+        self.folded = Counter()
+        self.folded_starts = Counter()
+        self.outcomes = Counter()
+        self.lengths = {ACCEPT: Counter(), MISSING_TRANSITION: Counter(),
+                        NOT_ACCEPTING: Counter()}
+
+    def _fold(self):
+        c = self.compiled
+        if c is None:
+            return
+        k = c.n_symbols
+        symbols = {col: s for s, col in c.symbol_index.items()}
+        for cell, hits in enumerate(self.hits):
+            if hits:
+                to_ = c.table[cell] // k
+                self.folded[(c.names[cell // k], symbols[cell % k],
+                             c.names[to_] if to_ != c.sink else None)] += hits
+        for q, starts in enumerate(self.starts):
+            if starts:
+                self.folded_starts[c.names[q]] += starts
+        self.compiled = None
+
+    def _table(self):
+        compiled = self.automaton.compile()
+        if compiled is not self.compiled:
+            self._fold()
+            self.compiled = compiled
+            self.hits = array('q', [0]) * len(compiled.table)
+            self.starts = array('q', [0]) * (compiled.n_states + 1)
+        return compiled
+
+    def _walk(self, sequence, write=None):
+        c = self._table()
+        table = c.table
+        cols = c.symbol_index
+        hits = self.hits
+        k = c.n_symbols
+        sink = c.sink * k
+        cur = c.initial * k
+        self.starts[c.initial] += 1
+        outputs = getattr(c, 'outputs', None)
+        n = 0
+        for s in sequence:
+            col = cols.get(s)
+            if col is None:
+                raise ValueError('sequence symbol {0} not in {1} alphabet.'
+                                 .format(s, self.automaton.__class__
+                                         .__name__))
+            cell = cur + col
+            hits[cell] += 1
+            n += 1
+            if table[cell] == sink:
+                self.outcomes[MISSING_TRANSITION] += 1
+                self.lengths[MISSING_TRANSITION][n] += 1
+                return False
+            if write is not None and outputs[cell]:
+                write(c.pool[outputs[cell]])
+            cur = table[cell]
+        outcome = ACCEPT if c.accept[cur // k] == 1 else NOT_ACCEPTING
+        self.outcomes[outcome] += 1
+        self.lengths[outcome][n] += 1
+        return outcome == ACCEPT
+
+    def accepts(self, sequence):
+        return self._walk(sequence)
+
+    def transduce(self, sequence, out=None):
+        buffer = [] if out is None else out
+        if isinstance(buffer, bytearray):
+            accepted = self._walk(
+                sequence, lambda text: buffer.extend(text.encode('utf-8')))
+        elif out is None:
+            accepted = self._walk(sequence, buffer.append)
+        else:
+            accepted = self._walk(sequence, buffer.write)
+        if out is None:
+            return accepted, ''.join(buffer)
+        return accepted
+
+    def as_dict(self):
+        """Counters keyed by state name, ready for JSON.
+
+        `transitions` lists (from, symbol, to, hits) with `to` None for the
+        hits on missing transitions; `visits` counts how often each state
+        was entered or started from; `rejects` splits the rejected inputs
+        by reason and `lengths` gives, per outcome, how many inputs had
+        each length (inputs stopped by a missing transition count the
+        symbols read up to it).
+        """
+        self._fold()
+        visits = Counter(self.folded_starts)
+        for (_, _, to_), hits in self.folded.items():
+            if to_ is not None:
+                visits[to_] += hits
+        return {
+            'runs': sum(self.outcomes.values()),
+            'accepted': self.outcomes[ACCEPT],
+            'rejects': {MISSING_TRANSITION: self.outcomes[MISSING_TRANSITION],
+                        NOT_ACCEPTING: self.outcomes[NOT_ACCEPTING]},
+            'visits': dict(visits),
+            'transitions': [[from_, symbol, to_, hits] for
+                            (from_, symbol, to_), hits in
+                            sorted(self.folded.items(),
+                                   key=lambda item: -item[1])],
+            'lengths': {outcome: dict(sorted(counts.items()))
+                        for outcome, counts in self.lengths.items()},
+        }
+
+    def to_json(self, **kwargs):
+        kwargs.setdefault('default', str)
+        return json.dumps(self.as_dict(), **kwargs)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+from functools import lru_cache
+
+from .dfa import DFA
+from .nfa import NFA
+
+
+class _Thompson(object):
+    def __init__(self, pattern, alphabet):
+        """Recursive descent parser building a Thompson NFA.
+
+        Supports literals, `\\` escapes, `.`, `[...]` sets with ranges and
+        `^` negation, grouping with `(...)` or `(?:...)`, alternation `|`
+        and the `*`, `+` and `?` operators. NFA states are indices into
+        `eps` (epsilon targets) and `moves` ((symbol, target) pairs).
+        """
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.pos = 0
+        self.eps = []
+        self.moves = []
+
+    def new_state(self):
+        self.eps.append([])
+        self.moves.append([])
+        return len(self.eps) - 1
+
+    def error(self, message):
+        return ValueError('{0} at position {1} of pattern {2!r}.'
+                          .format(message, self.pos, self.pattern))
+
+    def peek(self):
+        if self.pos < len(self.pattern):
+            return self.pattern[self.pos]
+        return None
+
+    def parse(self):
+        start, end = self.alternation()
+        if self.pos != len(self.pattern):
+            raise self.error('unbalanced parenthesis')
+        return start, end
+
+    def alternation(self):
+        branches = [self.concatenation()]
+        while self.peek() == '|':
+            self.pos += 1
+            branches.append(self.concatenation())
+        if len(branches) == 1:
+            return branches[0]
+        start, end = self.new_state(), self.new_state()
+        for b_start, b_end in branches:
+            self.eps[start].append(b_start)
+            self.eps[b_end].append(end)
+        return start, end
+
+    def concatenation(self):
+        start = end = self.new_state()
+        while self.peek() not in (None, '|', ')'):
+            f_start, f_end = self.repetition()
+            self.eps[end].append(f_start)
+            end = f_end
+        return start, end
+
+    def repetition(self):
+        start, end = self.atom()
+        while self.peek() in ('*', '+', '?'):
+            op = self.peek()
+            self.pos += 1
+            new_start, new_end = self.new_state(), self.new_state()
+            self.eps[new_start].append(start)
+            self.eps[end].append(new_end)
+            if op in ('*', '?'):
+                self.eps[new_start].append(new_end)
+            if op in ('*', '+'):
+                self.eps[end].append(start)
+            start, end = new_start, new_end
+        return start, end
+
+    def atom(self):
+        c = self.peek()
+        if c is None:
+            raise self.error('unexpected end')
+        self.pos += 1
+        if c == '(':
+            if self.pattern.startswith('?:', self.pos):
+                self.pos += 2
+            fragment = self.alternation()
+            if self.peek() != ')':
+                raise self.error('missing )')
+            self.pos += 1
+            return fragment
+        if c in ('*', '+', '?', ')'):
+            raise self.error('unexpected {!r}'.format(c))
+        if c == '.':
+            symbols = list(self.alphabet)
+        elif c == '[':
+            symbols = self.symbol_set()
+        else:
+            if c == '\\':
+                c = self.peek()
+                if c is None:
+                    raise self.error('trailing backslash')
+                self.pos += 1
+            symbols = [self.symbol(c)]
+        start, end = self.new_state(), self.new_state()
+        for s in symbols:
+            self.moves[start].append((s, end))
+        return start, end
+
+    def symbol(self, c):
+        if c not in self.alphabet:
+            raise self.error('symbol {!r} not in alphabet'.format(c))
+        return c
+
+    def symbol_set(self):
+        negate = self.peek() == '^'
+        if negate:
+            self.pos += 1
+        chars = []
+        first = True
+        while True:
+            c = self.peek()
+            if c is None:
+                raise self.error('missing ]')
+            if c == ']' and not first:
+                self.pos += 1
+                break
+            first = False
+            self.pos += 1
+            if c == '\\':
+                c = self.peek()
+                self.pos += 1
+            if (self.peek() == '-' and self.pos + 1 < len(self.pattern)
+                    and self.pattern[self.pos + 1] != ']'):
+                high = self.pattern[self.pos + 1]
+                self.pos += 2
+                chars.extend(s for s in self.alphabet if c <= s <= high)
+            else:
+                chars.append(c)
+        if negate:
+            return [s for s in self.alphabet if s not in chars]
+        return [self.symbol(c) for c in chars]
+
+
+def regex_nfa(pattern, alphabet):
+    """Thompson NFA for `pattern` over the single-character `alphabet`."""
+    builder = _Thompson(pattern, tuple(alphabet))
+    start, end = builder.parse()
+    nfa = NFA(list(alphabet))
+    for q in range(len(builder.eps)):
+        nfa.add_state(initial=q == start, accept=q == end)
+    states = nfa.states
+    for q, targets in enumerate(builder.eps):
+        for t in targets:
+            states[q].add_transition(states[t])
+    for q, moves in enumerate(builder.moves):
+        for s, t in moves:
+            states[q].add_transition(states[t], s)
+    return nfa
+
+
+@lru_cache(maxsize=256)
+def _regex_table(pattern, alphabet):
+    dfa = regex_nfa(pattern, alphabet).determinize()
+    dfa.minimize(method='hopcroft')
+
+    def name(state):
+        return 'q_{}'.format(state.id)
+
+    return (tuple(name(s) for s in dfa.states),
+            tuple((name(from_), name(to_), symbol)
+                  for from_, to_, symbol in dfa.transitions),
+            name(dfa.initial_state),
+            tuple(name(s) for s in dfa.states if s.accept))
+
+
+def compile_regex(pattern, alphabet):
+    """Minimal DFA for `pattern` over the single-character `alphabet`.
+
+    Parsing, determinization and minimization results are cached by
+    pattern and alphabet, so only the DFA objects are built on a repeated
+    call and callers are free to modify what they get back.
+    """
+    names, edges, initial, accept = _regex_table(pattern, tuple(alphabet))
+    return DFA.from_edges(list(alphabet), names, edges, initial=initial,
+                          accept=accept)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import random
+
+import numpy as np
+
+
+class Sampler(object):
+    def __init__(self, compiled, max_length):
+        """Uniform sampler of the inputs accepted by a compiled DFA.
+
+        counts[r][q] is how many inputs of length r lead row q (the sink
+        included) to acceptance, for r up to `max_length`, as exact
+        integers. Inputs are built one symbol at a time, each step picking
+        a column in proportion to the accepted completions it leaves and
+        then a symbol of that column. While the counts fit in 63 bits the
+        cumulative weights are also kept as an int64 table and whole
+        batches are drawn at once; beyond that each input is drawn with
+        exact integer arithmetic.
+        """
+        self.compiled = compiled
+        self.max_length = max_length
+        table = compiled.compress()
+        k = table.n_symbols
+        rows = table.n_states + 1
+        self.initial = table.initial
+        self.classes = [[] for _ in range(k)]
+        for s in compiled.alphabet:
+            self.classes[table.symbol_index[s]].append(s)
+        self.targets = (np.asarray(table.table, dtype=np.int64)
+                        .reshape(rows, k) // k)
+        sizes = np.array([len(c) for c in self.classes], dtype=object)
+        counts = np.zeros((max_length + 1, rows), dtype=object)
+        counts[0] = np.array([int(a) for a in table.accept], dtype=object)
+        for r in range(1, max_length + 1):
+            counts[r] = (counts[r - 1][self.targets] * sizes).sum(axis=1)
+        self.counts = counts
+        self.cumulative = None
+        if counts.max() < 2 ** 63:
+            # cumulative[r, q, c]: completions of length r through
+            # columns 0 .. c of row q.
+            weights = (counts[:-1].astype(np.int64)[:, self.targets]
+                       * sizes.astype(np.int64))
+            self.cumulative = np.cumsum(weights, axis=2)
+
+    def __repr__(self):
+        return '{0}(max_length={1}, exact={2})'.format(
+            self.__class__.__name__, self.max_length, self.cumulative is None)
+
+    def sample(self, n, lengths, rng=None, as_text=False):
+        """Draw `n` accepted inputs whose length is in `lengths`.
+
+        Every such input is equally likely. Returns symbol lists, or
+        strings when `as_text` is set (single character symbols only).
+        """
+        rng = np.random.default_rng(rng)
+        lengths = sorted(set(lengths))
+        if not lengths or lengths[0] < 0:
+            raise ValueError('sample lengths must be non negative.')
+        if lengths[-1] > self.max_length:
+            raise ValueError('{0} only samples up to length {1}.'
+                             .format(self.__class__.__name__,
+                                     self.max_length))
+        totals = [self.counts[r][self.initial] for r in lengths]
+        if sum(totals) == 0:
+            raise ValueError('{0} accepts no string of length {1}.'
+                             .format(self.compiled.__class__.__name__,
+                                     ', '.join(str(r) for r in lengths)))
+        if self.cumulative is None:
+            words = self._sample_exact(n, lengths, totals, rng)
+            if as_text:
+                return [''.join(w) for w in words]
+            return words
+        return self._sample_fast(n, lengths, totals, rng, as_text)
+
+    def _sample_exact(self, n, lengths, totals, rng):
+        exact = random.Random(int(rng.integers(2 ** 63)))
+        counts = self.counts
+        words = []
+        for _ in range(n):
+            pick = exact.randrange(sum(totals))
+            for r, total in zip(lengths, totals):
+                if pick < total:
+                    break
+                pick -= total
+            q = self.initial
+            word = []
+            for left in range(r, 0, -1):
+                pick = exact.randrange(counts[left][q])
+                for c, cl in enumerate(self.classes):
+                    rest = counts[left - 1][self.targets[q, c]]
+                    if pick < len(cl) * rest:
+                        break
+                    pick -= len(cl) * rest
+                word.append(cl[pick // rest])
+                q = self.targets[q, c]
+            words.append(word)
+        return words
+
+    def _sample_fast(self, n, lengths, totals, rng, as_text):
+        weights = np.array([float(t) for t in totals])
+        chosen = np.array(lengths)[rng.choice(len(lengths), size=n,
+                                              p=weights / weights.sum())]
+        # Longest first, so the inputs still growing are always a prefix.
+        order = np.argsort(-chosen, kind='stable')
+        left = chosen[order]
+        width = int(left[0]) if n else 0
+        sizes = np.array([len(c) for c in self.classes], dtype=np.int64)
+        # Symbols are numbered class by class from first[c].
+        first = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        flat = [s for cl in self.classes for s in cl]
+        plain = sizes.max() == 1
+        symbols = np.full((n, width), -1, dtype=np.int64)
+        q = np.full(n, self.initial, dtype=np.int64)
+        active = n
+        for step in range(width):
+            while left[active - 1] == step:
+                active -= 1
+            bounds = self.cumulative[left[:active] - (step + 1), q[:active]]
+            pick = rng.integers(bounds[:, -1])
+            c = (bounds <= pick[:, None]).sum(axis=1)
+            if plain:
+                symbols[:active, step] = c
+            else:
+                symbols[:active, step] = first[c] + rng.integers(sizes[c])
+            q[:active] = self.targets[q[:active], c]
+        if as_text:
+            # Code points padded with NULs, read back as fixed width text.
+            codes = np.array([ord(s) for s in flat] + [0], dtype=np.uint32)
+            words = (codes[symbols].view('<U{}'.format(width)).ravel()
+                     .tolist() if width else [''] * n)
+        else:
+            words = [[flat[i] for i in row[:length]] for row, length
+                     in zip(symbols.tolist(), left.tolist())]
+        result = [None] * n
+        for i, word in zip(order.tolist(), words):
+            result[i] = word
+        return result
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Versioned binary format for compiled automata.
+
+Layout, little-endian, every section starting on an 8-byte boundary:
+
+    header      see HEADER below
+    table       (states + 1) * columns row offsets, int32 or int64
+    accept      states + 1 uint8 flags
+    columns     alphabet-sized int32, the table column of each symbol
+    outputs     (states + 1) * columns int32 pool indices (Mealy only)
+    name ends   states int64 end offsets into the names blob
+    names       UTF-8 state names, concatenated
+    alphabet    UTF-8 JSON list of symbols
+    pool        UTF-8 JSON list of output strings (Mealy only)
+
+Loading maps the file and hands out memoryviews over it, so nothing but
+the two small JSON sections is parsed and processes loading the same file
+share its pages.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .compiled import CompiledDFA, CompiledMealy
+
+MAGIC = b'ATMT'
+VERSION = 1
+HAS_OUTPUTS = 1
+WIDE_TABLE = 2
+HEADER = struct.Struct('<4sHHIIIIIIQQQ')
+
+
+def _pad(n):
+    return -n % 8
+
+
+class _Names(object):
+    def __init__(self, ends, blob):
+        """State names decoded one at a time from the mapped names blob."""
+        self.ends = ends
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.ends)
+        start = self.ends[i - 1] if i > 0 else 0
+        return bytes(self.blob[start:self.ends[i]]).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self.ends)):
+            yield self[i]
+
+
+def _little(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def save(automaton, path):
+    """Write a DFA, MealyMachine or compiled table to `path`."""
+    compiled = automaton
+    if not isinstance(compiled, CompiledDFA):
+        compiled = automaton.compile()
+    if not all(isinstance(s, str) for s in compiled.alphabet):
+        raise ValueError('{} alphabet symbols must be strings to be saved.'
+                         .format(compiled.__class__.__name__))
+    k = compiled.n_symbols
+    wide = len(compiled.table) >= 2 ** 31
+    flags = WIDE_TABLE if wide else 0
+    mealy = isinstance(compiled, CompiledMealy)
+    if mealy:
+        flags |= HAS_OUTPUTS
+
+    names = [name.encode('utf-8') for name in compiled.names]
+    ends = array('q')
+    end = 0
+    for name in names:
+        end += len(name)
+        ends.append(end)
+    alphabet = json.dumps(compiled.alphabet).encode('utf-8')
+    pool = json.dumps(list(compiled.pool) if mealy else []).encode('utf-8')
+
+    sections = [
+        _little(array('q' if wide else 'i', compiled.table)),
+        bytes(compiled.accept),
+        _little(array('i', [compiled.symbol_index[s]
+                            for s in compiled.alphabet])),
+    ]
+    if mealy:
+        sections.append(_little(array('i', compiled.outputs)))
+    sections.extend([_little(ends), b''.join(names), alphabet, pool])
+
+    header = HEADER.pack(MAGIC, VERSION, flags, compiled.n_states, k,
+                         len(compiled.alphabet), compiled.initial,
+                         len(compiled.pool) if mealy else 0, 0,
+                         end, len(alphabet), len(pool))
+    with open(os.path.expanduser(path), 'wb') as f:
+        f.write(header)
+        f.write(b'\0' * _pad(HEADER.size))
+        for section in sections:
+            f.write(section)
+            f.write(b'\0' * _pad(len(section)))
+
+
+def load(path):
+    """Map a saved automaton; returns a CompiledDFA or CompiledMealy."""
+    with open(os.path.expanduser(path), 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buf)
+    if len(view) < HEADER.size:
+        raise ValueError('{} is not a saved automaton.'.format(path))
+    (magic, version, flags, n_states, k, n_alphabet, initial, n_pool, _,
+     names_len, alphabet_len, pool_len) = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError('{} is not a saved automaton.'.format(path))
+    if version != VERSION:
+        raise ValueError('{0} has format version {1}, expected {2}.'
+                         .format(path, version, VERSION))
+
+    pos = [HEADER.size + _pad(HEADER.size)]
+
+    def section(size, fmt=None):
+        start = pos[0]
+        pos[0] += size + _pad(size)
+        chunk = view[start:start + size]
+        if fmt is None:
+            return chunk
+        if sys.byteorder == 'big':
+            values = array(fmt, chunk.tobytes())
+            values.byteswap()
+            return values
+        return chunk.cast(fmt)
+
+    cells = (n_states + 1) * k
+    wide = flags & WIDE_TABLE
+    table = section(cells * (8 if wide else 4), 'q' if wide else 'i')
+    accept = section(n_states + 1)
+    columns = section(n_alphabet * 4, 'i')
+    outputs = section(cells * 4, 'i') if flags & HAS_OUTPUTS else None
+    names = _Names(section(n_states * 8, 'q'), section(names_len))
+    alphabet = json.loads(bytes(section(alphabet_len)).decode('utf-8'))
+    pool = json.loads(bytes(section(pool_len)).decode('utf-8'))
+    if len(pool) != n_pool:
+        raise ValueError('{} output pool is truncated.'.format(path))
+    symbol_index = dict(zip(alphabet, columns))
+
+    if outputs is not None:
+        compiled = CompiledMealy(alphabet, names, table, accept, initial,
+                                 outputs, pool, symbol_index=symbol_index)
+    else:
+        compiled = CompiledDFA(alphabet, names, table, accept, initial,
+                               symbol_index=symbol_index)
+    # Keep the mapping alive as long as the views into it.
+    compiled._buffer = buf
+    return compiled
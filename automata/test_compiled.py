@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import pytest
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_accepts_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    compiled = dfa.compile()
+    for w in words():
+        assert compiled.accepts(w) == dfa.process_sequence(w)
+    for state in dfa.states:
+        for symbol in dfa.alphabet:
+            moves = [to_ for to_, s in state.transitions if s == symbol]
+            expected = moves[0].id if moves else compiled.sink
+            assert compiled.next_state(state.id, symbol) == expected
+
+
+def test_first_transition_on_a_symbol_wins(random_dfa, words):
+    dfa = random_dfa(0)
+    for state in dfa.states:
+        state.add_transition(dfa.states[0], 'a')
+    for w in words():
+        assert dfa.accepts(w) == dfa.process_sequence(w)
+
+
+def test_accepts_unknown_symbol(random_dfa):
+    with pytest.raises(ValueError):
+        random_dfa(0).accepts('ac')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_accepts_batch_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    batch = words()
+    expected = [dfa.process_sequence(w) for w in batch]
+    assert dfa.accepts_batch(batch).tolist() == expected
+
+
+def test_accepts_batch_symbol_lists(random_dfa, words):
+    dfa = random_dfa(0)
+    batch = [list(w) for w in words()]
+    expected = [dfa.process_sequence(w) for w in batch]
+    assert dfa.accepts_batch(batch).tolist() == expected
+    assert dfa.accepts_batch(words()).tolist() == expected
+
+
+def test_accepts_batch_unknown_symbol(random_dfa):
+    dfa = random_dfa(0)
+    for batch in (['ab', 'ac'], [['a'], ['c']]):
+        with pytest.raises(ValueError):
+            dfa.accepts_batch(batch)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_stream_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    for w in words(max_length=5):
+        for cut in range(len(w) + 1):
+            matcher = dfa.stream()
+            matcher.feed(w[:cut])
+            matcher.feed(w[cut:])
+            assert matcher.finish() == dfa.process_sequence(w)
+
+
+def _with_copied_symbol(machine):
+    # 'c' moves (and writes) exactly like 'a', so it shares a class.
+    machine.alphabet.append('c')
+    for from_, to_, *label in list(machine.transitions):
+        if label[0] == 'a':
+            machine.add_transition(from_.name, to_.name, 'c', *label[1:])
+    return machine
+
+
+def _swap_classmates(classes, word):
+    # Every word got by replacing symbols with others of their class.
+    class_of = {s: cl for cl in classes for s in cl}
+    return [''.join(w) for w in itertools.product(
+        *[class_of[c] for c in word])]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_symbol_classes_match_process_sequence(random_dfa, random_mealy,
+                                               words, seed):
+    for machine in (_with_copied_symbol(random_dfa(seed)),
+                    _with_copied_symbol(random_mealy(seed))):
+        classes = machine.symbol_classes()
+        assert sorted(s for cl in classes for s in cl) == \
+            sorted(machine.alphabet)
+        assert any('a' in cl and 'c' in cl for cl in classes)
+        for w in words('abc', 4):
+            expected = machine.process_sequence(w)
+            for other in _swap_classmates(classes, w):
+                assert machine.process_sequence(other) == expected
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_compress_matches_process_sequence(random_dfa, words, seed):
+    dfa = _with_copied_symbol(random_dfa(seed))
+    compressed = dfa.compile().compress()
+    assert compressed.n_symbols < len(dfa.alphabet)
+    for w in words('abc', 5):
+        assert compressed.accepts(w) == dfa.process_sequence(w)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_mealy_transduce_matches_process_sequence(random_mealy, words,
+                                                   seed):
+    machine = _with_copied_symbol(random_mealy(seed))
+    compiled = machine.compile()
+    compressed = compiled.compress()
+    assert compressed.n_symbols < len(machine.alphabet)
+    for w in words('abc', 5):
+        expected = machine.process_sequence(w)
+        assert compiled.transduce(w) == expected
+        assert compressed.transduce(w) == expected
+        out = bytearray()
+        assert compiled.transduce(w, out) == expected[0]
+        assert out.decode('utf-8') == expected[1]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_accepts_bytes_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    for w in words():
+        expected = dfa.process_sequence(w)
+        data = w.encode('ascii')
+        assert dfa.accepts_bytes(data) == expected
+        assert dfa.accepts_bytes(bytearray(data)) == expected
+        assert dfa.accepts_bytes(memoryview(data)) == expected
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_accepts_file_matches_process_sequence(random_dfa, words, tmp_path,
+                                               seed):
+    dfa = random_dfa(seed)
+    path = tmp_path / 'input'
+    for w in words(max_length=4):
+        path.write_bytes(w.encode('ascii'))
+        assert dfa.accepts_file(str(path)) == dfa.process_sequence(w)
+
+
+def test_accepts_bytes_unknown_byte(random_dfa):
+    with pytest.raises(ValueError):
+        random_dfa(0).accepts_bytes(b'ac')
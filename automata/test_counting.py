@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+
+def _count_by_walk(dfa, n):
+    # Exact counts by length, one step over the states at a time.
+    counts = {dfa.initial_state: 1}
+    for _ in range(n):
+        nxt = {}
+        for state, c in counts.items():
+            for symbol in dfa.alphabet:
+                for to_, s in state.transitions:
+                    if s == symbol:
+                        nxt[to_] = nxt.get(to_, 0) + c
+                        break
+        counts = nxt
+    return sum(c for state, c in counts.items() if state.accept)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_count_accepted_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    by_length = [0] * 7
+    for w in words():
+        if dfa.process_sequence(w):
+            by_length[len(w)] += 1
+    for n in range(7):
+        assert dfa.count_accepted(n) == by_length[n]
+        assert dfa.count_accepted_upto(n) == sum(by_length[:n + 1])
+        assert dfa.density(n) == by_length[n] / 2 ** n
+
+
+@pytest.mark.parametrize('n', [64, 200, 5000])
+@pytest.mark.parametrize('seed', range(3))
+def test_count_accepted_long_inputs(random_dfa, seed, n):
+    # Past 2 ** 63 the counts switch to Python integers, and for long
+    # inputs to matrix squaring.
+    dfa = random_dfa(seed, n_states=4)
+    assert dfa.count_accepted(n) == _count_by_walk(dfa, n)
+    total = sum(_count_by_walk(dfa, m) for m in range(65))
+    assert dfa.count_accepted_upto(64) == total
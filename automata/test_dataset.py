@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import itertools
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from automata.dataset import (FAKE_FP, GENUINE_FP, FacebookIPR,
+                              classify_dataset, friend_pattern, genuine_mask,
+                              load_edges)
+from automata.regexp import compile_regex
+
+
+def _friends(text):
+    friends = {}
+    for line in text.splitlines():
+        if line.strip() and not line.lstrip().startswith('#'):
+            u, v = map(int, line.split())
+            friends.setdefault(u, []).append(v)
+    return friends
+
+
+TEXTS = [
+    '0 1\n1 0\n\n',
+    '# comment\n\n0 1\n2 0\n',
+    '0 1\n\n\n# c\n1 2\n2 0',
+    '3 1\n0 2\n3 0\n1 3\n',
+    '',
+]
+
+
+@pytest.mark.parametrize('block_size', [1, 3, 7, 1 << 24])
+@pytest.mark.parametrize('text', TEXTS)
+def test_load_edges(tmp_path, text, block_size):
+    path = tmp_path / 'edges.txt'
+    path.write_text(text)
+    graph = load_edges(str(path), block_size=block_size)
+    loaded = {u: friends.tolist() for u, friends in graph.items()}
+    assert loaded == _friends(text)
+
+
+def test_load_edges_odd_line(tmp_path):
+    path = tmp_path / 'edges.txt'
+    path.write_text('0 1\n2\n')
+    with pytest.raises(ValueError):
+        load_edges(str(path))
+
+
+def test_facebook_ipr_does_not_load_numpy():
+    code = ('import sys; from automata import FacebookIPR; '
+            'assert FacebookIPR().check_profile("aba#"); '
+            'assert "numpy" not in sys.modules')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', code], cwd=root, check=True)
+
+
+def _pattern_dfa(pattern):
+    return compile_regex(pattern, ['a', 'b', '#'])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_friend_pattern_matches_labels(seed):
+    genuine = genuine_mask(50, 20, rng=seed)
+    assert genuine.sum() == 20
+    friends = list(range(0, 50, 3))
+    patterns, labels = friend_pattern(friends, genuine, rng=seed)
+    assert labels.tolist() == genuine[friends].tolist()
+    assert len(set(patterns)) == len(patterns)
+    genuine_dfa, fake_dfa = _pattern_dfa(GENUINE_FP), _pattern_dfa(FAKE_FP)
+    for fp, label in zip(patterns, labels):
+        dfa = genuine_dfa if label else fake_dfa
+        assert dfa.process_sequence(fp)
+    again = friend_pattern(friends, genuine_mask(50, 20, rng=seed), rng=seed)
+    assert again[0] == patterns
+    assert again[1].tolist() == labels.tolist()
+
+
+def test_facebook_ipr_matches_process_sequence():
+    fb_ipr = FacebookIPR()
+    profiles = [''.join(w) + '#' for n in range(6)
+                for w in itertools.product('ab', repeat=n)]
+    expected = [fb_ipr.dfa.process_sequence(p) for p in profiles]
+    assert [fb_ipr.check_profile(p) for p in profiles] == expected
+    assert fb_ipr.check_profiles(profiles).tolist() == expected
+
+
+def test_classify_dataset_does_not_depend_on_split():
+    ds = {px: [(px * 7 + k) % 30 for k in range(1 + px % 4)]
+          for px in range(30)}
+    genuine = genuine_mask(30, 12, rng=0)
+    fb_ipr = FacebookIPR()
+    results = [classify_dataset(ds, fb_ipr, genuine, workers=w, shards=n,
+                                seed=3)
+               for w, n in [(1, 1), (2, 3), (3, 30)]]
+    assert results[1] == results[0]
+    assert results[2] == results[0]
+    test_genuine, test_fake, pred_genuine, pred_fake, y_test, y_pred = \
+        results[0]
+    expected = []
+    for px, fl in ds.items():
+        rng = np.random.default_rng([3, px])
+        patterns, _ = friend_pattern(fl, genuine, rng)
+        expected.extend(fb_ipr.dfa.process_sequence(p) for p in patterns)
+    assert y_pred == ['genuine' if e else 'fake' for e in expected]
+    assert pred_genuine == sum(expected)
+    assert pred_fake == len(expected) - sum(expected)
+    assert test_genuine + test_fake == len(y_test) == len(expected)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import copy
+import random
+
+import numpy as np
+import pytest
+
+from automata.dfa import DFA, MealyMachine
+
+
+def _chain(a, b, word):
+    accepted, middle = a.process_sequence(word)
+    if not accepted:
+        return False, None
+    accepted, out = b.process_sequence(middle)
+    return accepted, out if accepted else None
+
+
+@pytest.mark.parametrize('minimize', [False, True])
+@pytest.mark.parametrize('seed', range(20))
+def test_compose_matches_chained_stages(random_mealy, words, minimize,
+                                        seed):
+    a = random_mealy(seed, out_alphabet='ab')
+    b = random_mealy(seed + 100, n_states=4)
+    composed = a.compose(b, minimize=minimize)
+    for w in words():
+        accepted, out = composed.transduce(w)
+        assert (accepted, out if accepted else None) == _chain(a, b, w)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_compose_minimized_keeps_rejected_outputs(random_mealy, words,
+                                                  seed):
+    a = random_mealy(seed, out_alphabet='ab')
+    b = random_mealy(seed + 100, n_states=4)
+    composed = a.compose(b, minimize=False)
+    minimized = a.compose(b)
+    assert len(minimized.states) <= len(composed.states)
+    for w in words():
+        assert minimized.transduce(w) == composed.transduce(w)
+
+
+def test_compose_state_names_do_not_collide():
+    # Joining the component names gives '(x,y,z)' for both pair states.
+    a = MealyMachine(['0'], ['0'])
+    a.add_state('x', initial=True, accept=True)
+    a.add_state('x,y')
+    a.add_transition('x', 'x,y', '0', '0')
+    a.add_transition('x,y', 'x', '0', '0')
+    b = MealyMachine(['0'], ['0', '1'])
+    b.add_state('y,z', initial=True, accept=True)
+    b.add_state('z', accept=True)
+    b.add_transition('y,z', 'z', '0', '0')
+    b.add_transition('z', 'y,z', '0', '1')
+    composed = a.compose(b, minimize=False)
+    assert len(composed.states) == 2
+    assert composed.process_sequence('0')[0] is False
+    assert composed.process_sequence('00') == (True, '01')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_pruning_keeps_the_language(random_dfa, words, seed):
+    dfa = random_dfa(seed, n_states=8)
+    trimmed, removed = dfa.trim()
+    pruned = copy.deepcopy(dfa)
+    pruned.remove_unreachable_states()
+    pruned.remove_useless_states()
+    assert len(trimmed.states) + len(removed) == len(dfa.states)
+    assert (sorted(s.name for s in pruned.states)
+            == sorted(s.name for s in trimmed.states))
+    # What is left may have no transition or accept state to run
+    # process_sequence on, so the copies run compiled.
+    for w in words():
+        expected = dfa.process_sequence(w)
+        assert trimmed.accepts(w) == expected
+        assert pruned.accepts(w) == expected
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_trim_keeps_mealy_outputs(random_mealy, words, seed):
+    machine = random_mealy(seed, n_states=8)
+    trimmed, _ = machine.trim()
+    assert isinstance(trimmed, MealyMachine)
+    assert trimmed.out_alphabet == machine.out_alphabet
+    for w in words():
+        accepted, out = machine.process_sequence(w)
+        if accepted:
+            assert trimmed.transduce(w) == (True, out)
+        else:
+            assert trimmed.transduce(w)[0] is False
+
+
+def test_state_transitions_are_read_only(random_dfa):
+    dfa = random_dfa(0)
+    state = dfa.states[0]
+    with pytest.raises(AttributeError):
+        state.transitions.append((state, 'a'))
+    state.transitions = [(state, 'b')]
+    state.add_transition(dfa.states[1], 'a')
+    assert state.transitions == ((state, 'b'), (dfa.states[1], 'a'))
+    assert dfa.process_sequence('bba') == dfa.states[1].accept
+
+
+def _reference_run(initial, accept, edges, word):
+    # Plain lists: edges[i] holds (target, symbol, output) of state i.
+    cur, out = initial, []
+    for c in word:
+        for to_, symbol, output in edges[cur]:
+            if symbol == c:
+                out.append(output)
+                cur = to_
+                break
+        else:
+            return False, ''.join(out)
+    return accept[cur], ''.join(out)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_edit_states_in_place(random_mealy, words, seed):
+    rnd = random.Random(seed)
+    machine = random_mealy(seed, n_states=5)
+    n = len(machine.states)
+    names = [s.name for s in machine.states]
+    accept = [s.accept for s in machine.states]
+    edges = [[(to_.id, symbol, out) for to_, symbol, out in s.transitions]
+             for s in machine.states]
+    pool = ['q_0', 'q_1', 'q_4', 'q_7', 'x', 'y', 'x,y']
+    for _ in range(30):
+        i = rnd.randrange(n)
+        if rnd.random() < 0.5:
+            name = rnd.choice(pool)
+            machine.states[i].name = name
+            names[i] = name
+        else:
+            edges[i] = [(rnd.randrange(n), rnd.choice('ab'),
+                         rnd.choice(['', 'x', 'xy']))
+                        for _ in range(rnd.randrange(4))]
+            machine.states[i].transitions = [
+                (machine.states[j], symbol, out)
+                for j, symbol, out in edges[i]]
+        for name in set(names) | set(pool):
+            first = names.index(name) if name in names else None
+            state = machine.get_state(name)
+            assert (state.id if state is not None else None) == first
+        assert [s.name for s in machine.states] == names
+        assert len(machine.transitions) == sum(map(len, edges))
+        if not any(edges):
+            continue
+        for w in words(max_length=4):
+            expected = _reference_run(0, accept, edges, w)
+            assert machine.process_sequence(w) == expected
+            assert machine.transduce(w) == expected
+
+
+def _table(dfa):
+    # Target index of the first transition on each symbol, -1 for none.
+    index = {state: i for i, state in enumerate(dfa.states)}
+    table = []
+    for state in dfa.states:
+        row = []
+        for symbol in dfa.alphabet:
+            moves = [to_ for to_, s in state.transitions if s == symbol]
+            row.append(index[moves[0]] if moves else -1)
+        table.append(row)
+    return table
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_from_edges_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    names = [state.name for state in dfa.states]
+    edges = [(from_.name, to_.name, s) for from_, to_, s in dfa.transitions]
+    accept = [state.name for state in dfa.get_accept_states()]
+    built = DFA.from_edges(dfa.alphabet, names, edges, accept=accept)
+    for w in words():
+        assert built.process_sequence(w) == dfa.process_sequence(w)
+    for name in names:
+        assert built.get_state(name).id == dfa.get_state(name).id
+    assert built.get_state('missing') is None
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_from_table_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    table = _table(dfa)
+    mask = [state.accept for state in dfa.states]
+    for built in (DFA.from_table(dfa.alphabet, table, accept=mask),
+                  DFA.from_table(dfa.alphabet, np.array(table),
+                                 accept=np.array(mask))):
+        assert [s.name for s in built.states] == \
+            [s.name for s in dfa.states]
+        for w in words():
+            assert built.process_sequence(w) == dfa.process_sequence(w)
+
+
+def test_from_edges_unknown_state_or_symbol():
+    with pytest.raises(ValueError):
+        DFA.from_edges('ab', ['p'], [('p', 'r', 'a')])
+    with pytest.raises(ValueError):
+        DFA.from_edges('ab', ['p'], [('p', 'p', 'c')])
+    with pytest.raises(ValueError):
+        DFA.from_table('ab', [[0]])
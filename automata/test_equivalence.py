@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import pytest
+
+
+def shortest_accepted(dfa):
+    """Length of the shortest input `dfa` accepts, or None."""
+    start = dfa.initial_state
+    depth = {start: 0}
+    queue = [start]
+    for state in queue:
+        if state.accept:
+            return depth[state]
+        for to_, _ in state.transitions:
+            if to_ not in depth:
+                depth[to_] = depth[state] + 1
+                queue.append(to_)
+    return None
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_counterexample_is_shortest(random_dfa, seed):
+    a, b = random_dfa(seed, n_states=4), random_dfa(seed + 100, n_states=3)
+    word = a.counterexample(b)
+    assert a.equivalent(b) == (word is None)
+    expected = shortest_accepted(a.symmetric_difference(b))
+    if word is None:
+        assert expected is None
+    else:
+        assert len(word) == expected
+        assert a.process_sequence(word) != b.process_sequence(word)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_minimize_hopcroft_is_equivalent(random_dfa, seed):
+    dfa = random_dfa(seed)
+    minimized = copy.deepcopy(dfa)
+    minimized.minimize(method='hopcroft')
+    assert dfa.equivalent(minimized)
+    assert dfa.counterexample(minimized) is None
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_minimize_hopcroft_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    minimized = copy.deepcopy(dfa)
+    minimized.minimize(method='hopcroft')
+    assert len(minimized.states) <= len(dfa.states)
+    if not minimized.get_accept_states():
+        assert shortest_accepted(dfa) is None
+        return
+    for w in words():
+        assert minimized.process_sequence(w) == dfa.process_sequence(w)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_mealy_minimize_hopcroft_matches_process_sequence(random_mealy, words,
+                                                          seed):
+    machine = random_mealy(seed)
+    minimized = copy.deepcopy(machine)
+    minimized.minimize(method='hopcroft')
+    assert len(minimized.states) <= len(machine.states)
+    for w in words():
+        assert minimized.transduce(w) == machine.process_sequence(w)
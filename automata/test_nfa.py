@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+
+from automata.nfa import NFA
+from automata.regexp import regex_nfa
+
+PATTERNS = ['(a|b)*abb', '(a|b)*a(a|b)(a|b)', '(a*|b)(b|ab*a)', 'a?b+(ab)*']
+
+
+@pytest.mark.parametrize('max_states', [None, 2, 1024])
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_lazy_dfa_matches_determinized(words, pattern, max_states):
+    nfa = regex_nfa(pattern, 'ab')
+    dfa = nfa.determinize()
+    matcher = nfa.matcher(max_states=max_states)
+    expected = re.compile(pattern)
+    for w in words(max_length=7):
+        accepted = expected.fullmatch(w) is not None
+        assert dfa.process_sequence(w) == accepted
+        assert matcher.accepts(w) == accepted
+    if max_states == 2:
+        assert matcher.flushes > 0
+
+
+def test_epsilon_moves():
+    nfa = NFA(['a', 'b'])
+    nfa.add_state(initial=True)
+    nfa.add_state()
+    nfa.add_state(accept=True)
+    nfa.add_transition('q_0', 'q_1')
+    nfa.add_transition('q_1', 'q_1', 'a')
+    nfa.add_transition('q_1', 'q_2', 'b')
+    nfa.add_transition('q_0', 'q_2', 'a')
+    dfa = nfa.determinize()
+    for w in ['', 'a', 'b', 'ab', 'aab', 'ba', 'abb']:
+        expected = re.fullmatch('a*b|a', w) is not None
+        assert nfa.accepts(w) == expected
+        assert dfa.process_sequence(w) == expected
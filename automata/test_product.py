@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from automata.dfa import DFA
+
+OPERATIONS = {
+    'intersection': lambda a, b: a and b,
+    'union': lambda a, b: a or b,
+    'difference': lambda a, b: a and not b,
+    'symmetric_difference': lambda a, b: a != b,
+}
+
+
+@pytest.mark.parametrize('operation', sorted(OPERATIONS))
+@pytest.mark.parametrize('seed', range(10))
+def test_product_matches_process_sequence(random_dfa, words, operation,
+                                          seed):
+    a, b = random_dfa(seed), random_dfa(seed + 100, n_states=4)
+    expected = [OPERATIONS[operation](a.process_sequence(w),
+                                      b.process_sequence(w))
+                for w in words()]
+    lazy = getattr(a, operation)(b, lazy=True)
+    assert [lazy.accepts(w) for w in words()] == expected
+    dfa = getattr(a, operation)(b)
+    assert [dfa.accepts(w) for w in words()] == expected
+
+
+def test_product_state_names_do_not_collide():
+    # Joining the component names gives '(x,y,z)' for both product states.
+    a = DFA.from_edges(['0'], ['x', 'x,y'],
+                       [('x', 'x,y', '0'), ('x,y', 'x', '0')],
+                       accept=['x'])
+    b = DFA.from_edges(['0'], ['y,z', 'z'],
+                       [('y,z', 'z', '0'), ('z', 'y,z', '0')],
+                       accept=['y,z'])
+    both = a.intersection(b)
+    assert len(both.states) == 2
+    assert ([both.accepts('0' * n) for n in range(4)]
+            == [True, False, True, False])
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+
+import pytest
+
+from automata.tracing import Trace
+
+
+class CountTrace(Trace):
+    """Counts what process_sequence does, the way Profile reports it."""
+
+    def __init__(self):
+        self.transitions = Counter()
+        self.outcomes = Counter()
+
+    def step(self, from_state, symbol, to_state, output=None):
+        self.transitions[(from_state.name, symbol,
+                          None if to_state is None else to_state.name)] += 1
+        if to_state is None:
+            self.outcomes['missing_transition'] += 1
+
+    def end(self, state, accepted):
+        self.outcomes['accept' if accepted else 'not_accepting'] += 1
+
+
+def _expected(machine, batch):
+    trace = CountTrace()
+    results = [machine.process_sequence(w, trace=trace) for w in batch]
+    return results, trace
+
+
+def _check(profile, trace, runs):
+    counts = profile.as_dict()
+    assert counts['runs'] == runs
+    assert counts['accepted'] == trace.outcomes['accept']
+    assert counts['rejects'] == {
+        'missing_transition': trace.outcomes['missing_transition'],
+        'not_accepting': trace.outcomes['not_accepting']}
+    assert {(f, s, t): hits for f, s, t, hits in counts['transitions']} == \
+        dict(trace.transitions)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_profile_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    batch = words()
+    expected, trace = _expected(dfa, batch)
+    profile = dfa.enable_profiling()
+    assert [dfa.accepts(w) for w in batch] == expected
+    _check(profile, trace, len(batch))
+    dfa.disable_profiling()
+    assert dfa.accepts('a') == dfa.process_sequence('a')
+    assert profile.as_dict()['runs'] == len(batch)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_mealy_profile_matches_process_sequence(random_mealy, words, seed):
+    machine = random_mealy(seed)
+    batch = words()
+    expected, trace = _expected(machine, batch)
+    profile = machine.enable_profiling()
+    assert [machine.transduce(w) for w in batch] == expected
+    _check(profile, trace, len(batch))
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_profile_survives_edits(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    batch = words(max_length=4)
+    profile = dfa.enable_profiling()
+    for w in batch:
+        dfa.accepts(w)
+    # Rebuilds the compiled table; the counts so far are kept by name.
+    dfa.add_state('extra')
+    for w in batch:
+        assert dfa.accepts(w) == dfa.process_sequence(w)
+    _, trace = _expected(dfa, batch + batch)
+    _check(profile, trace, 2 * len(batch))
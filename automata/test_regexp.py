@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+
+from automata.regexp import compile_regex
+
+PATTERNS = [
+    'a',
+    'ab*',
+    '(a|b)*abb',
+    '(a|b)+a#',
+    '(a*|b)(b|ab*a)#',
+    'a?b+(?:ab)*',
+    '[ab]c?[^a]',
+    '.*c.*',
+    '(a|)(b|c)*',
+    r'a\*b',
+]
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_compile_regex_matches_re(words, pattern):
+    alphabet = 'abc#*'
+    dfa = compile_regex(pattern, alphabet)
+    expected = re.compile(pattern)
+    for w in words(alphabet, 4):
+        assert (dfa.process_sequence(w)
+                == (expected.fullmatch(w) is not None)), w
+
+
+def test_compile_regex_returns_fresh_dfas():
+    a = compile_regex('ab*', 'ab')
+    a.states[0].accept = True
+    assert not compile_regex('ab*', 'ab').accepts('')
+
+
+@pytest.mark.parametrize('pattern', ['(a', 'a)', '*a', '[ab', 'd'])
+def test_compile_regex_rejects_bad_patterns(pattern):
+    with pytest.raises(ValueError):
+        compile_regex(pattern, 'abc')
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import collections
+
+import pytest
+
+from automata.dfa import DFA
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_samples_are_accepted_and_uniform(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    lengths = range(2, 5)
+    accepted = [w for w in words(max_length=4)
+                if len(w) in lengths and dfa.process_sequence(w)]
+    if not accepted:
+        with pytest.raises(ValueError):
+            dfa.sample(1, lengths, rng=seed)
+        return
+    n = 300 * len(accepted)
+    drawn = collections.Counter(dfa.sample(n, lengths, rng=seed))
+    assert set(drawn) == set(accepted)
+    assert all(150 < c < 450 for c in drawn.values())
+    assert dfa.sample(20, lengths, rng=seed) == dfa.sample(20, lengths,
+                                                           rng=seed)
+
+
+def test_samples_with_symbol_classes():
+    # 'b' and 'c' move alike, so they share a column when sampling.
+    dfa = DFA.from_table('abc', [[1, 0, 0], [1, 1, 1]], accept=[1])
+    drawn = collections.Counter(dfa.sample(6000, 2, rng=0))
+    expected = [a + b for a in 'abc' for b in 'abc'
+                if dfa.process_sequence(a + b)]
+    assert set(drawn) == set(expected)
+    assert all(600 < c < 1400 for c in drawn.values())
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_samples_past_int64(random_dfa, seed):
+    # Counts of length 100 overflow int64, so drawing is exact.
+    dfa = random_dfa(seed, alphabet='abcd')
+    assert dfa.count_accepted(100) >= 2 ** 63
+    for word in dfa.sample(20, 100, rng=seed):
+        assert len(word) == 100
+        assert dfa.process_sequence(word)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from automata.dfa import DFA, MealyMachine
+from automata.serialize import load
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_dfa_round_trip(random_dfa, words, tmp_path, seed):
+    dfa = random_dfa(seed)
+    path = str(tmp_path / 'dfa.bin')
+    dfa.save(path)
+    loaded = DFA.load(path)
+    compiled = load(path)
+    for w in words():
+        expected = dfa.process_sequence(w)
+        assert loaded.process_sequence(w) == expected
+        assert compiled.accepts(w) == expected
+    assert [s.name for s in loaded.states] == [s.name for s in dfa.states]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_mealy_round_trip(random_mealy, words, tmp_path, seed):
+    machine = random_mealy(seed)
+    path = str(tmp_path / 'mealy.bin')
+    machine.save(path)
+    loaded = MealyMachine.load(path)
+    compiled = load(path)
+    for w in words():
+        expected = machine.process_sequence(w)
+        assert loaded.process_sequence(w) == expected
+        assert compiled.transduce(w) == expected
+    assert set(loaded.out_alphabet) <= set(machine.out_alphabet)
+
+
+def test_mealy_load_needs_outputs(random_dfa, tmp_path):
+    path = str(tmp_path / 'dfa.bin')
+    random_dfa(0).save(path)
+    with pytest.raises(ValueError):
+        MealyMachine.load(path)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from automata.tracing import PrintTrace, RingTrace
+
+
+def _steps(machine, word):
+    # Steps taken by following the first transition on each symbol.
+    state, steps = machine.initial_state, []
+    for symbol in word:
+        moves = [t for t in machine.transitions
+                 if t[0] == state and t[2] == symbol]
+        if not moves:
+            steps.append((state.name, symbol, None))
+            break
+        steps.append((state.name, symbol, moves[0][1].name))
+        state = moves[0][1]
+    return steps
+
+
+def _names(events):
+    return [(f.name, s, None if t is None else t.name)
+            for f, s, t, _ in events]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_ring_trace_matches_process_sequence(random_dfa, words, seed):
+    dfa = random_dfa(seed)
+    trace = RingTrace()
+    for w in words():
+        accepted = dfa.process_sequence(w, trace=trace)
+        assert accepted == dfa.process_sequence(w)
+        assert trace.accepted == accepted
+        assert _names(trace.events) == _steps(dfa, w)
+        assert all(output is None for *_, output in trace.events)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_ring_trace_mealy_outputs(random_mealy, words, seed):
+    machine = random_mealy(seed)
+    trace = RingTrace()
+    for w in words():
+        accepted, output = machine.process_sequence(w, trace=trace)
+        assert trace.accepted == accepted
+        assert _names(trace.events) == _steps(machine, w)
+        assert ''.join(o for *_, o in trace.events if o is not None) == \
+            output
+
+
+def test_ring_trace_keeps_the_last_steps(random_dfa, words):
+    dfa = random_dfa(0)
+    trace = RingTrace(size=3)
+    for w in words():
+        dfa.process_sequence(w, trace=trace)
+        assert _names(trace.events) == _steps(dfa, w)[-3:]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_verbose_prints_every_step(random_dfa, words, capsys, seed):
+    dfa = random_dfa(seed)
+    for w in words(max_length=4):
+        assert dfa.process_sequence(w, verbose=True) == \
+            dfa.process_sequence(w)
+        printed = capsys.readouterr().out.splitlines()
+        assert printed[0] == 'Processing "{}"'.format(w)
+        steps = [line for line in printed if line.startswith('\t(')]
+        assert len(steps) == sum(t is not None for *_, t in _steps(dfa, w))
+        assert ('\tAccept' in printed) == dfa.process_sequence(w)
+        dfa.process_sequence(w, trace=PrintTrace())
+        assert capsys.readouterr().out.splitlines() == printed
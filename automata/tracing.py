@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from collections import deque
+
+
+class Trace(object):
+    """Receives what process_sequence does; this base class ignores it.
+
+    `start` is called before the first symbol, `step` once per symbol with
+    the state left, the symbol, the state entered and the output written
+    (None for DFAs) and `end` once the whole input has been read. A symbol
+    without a transition is reported as a step to None, after which the
+    run stops without `end`.
+    """
+
+    def start(self, automaton, sequence):
+        pass
+
+    def step(self, from_state, symbol, to_state, output=None):
+        pass
+
+    def end(self, state, accepted):
+        pass
+
+
+NULL_TRACE = Trace()
+
+
+class RingTrace(Trace):
+    def __init__(self, size=64):
+        """Keeps the last `size` steps of the latest run in `events`.
+
+        `accepted` is the outcome of that run, None while it is going.
+        """
+        self.events = deque(maxlen=size)
+        self.accepted = None
+
+    def start(self, automaton, sequence):
+        self.events.clear()
+        self.accepted = None
+
+    def step(self, from_state, symbol, to_state, output=None):
+        self.events.append((from_state, symbol, to_state, output))
+        if to_state is None:
+            self.accepted = False
+
+    def end(self, state, accepted):
+        self.accepted = accepted
+
+
+class PrintTrace(Trace):
+    """Prints every step, as process_sequence always used to."""
+
+    def start(self, automaton, sequence):
+        self.name = automaton.__class__.__name__
+        self.mealy = getattr(automaton, 'out_alphabet', None) is not None
+        self.output = []
+        print('Processing "{}"'.format(sequence))
+        print('Transitions:')
+
+    def step(self, from_state, symbol, to_state, output=None):
+        if to_state is None:
+            print('\tReject', end='\t')
+            print(('{cl_name} without transition for {state.name} '
+                   'with symbol "{symbol}".' if self.mealy else
+                   '{cl_name} without transition for {state.name} '
+                   'with symbol {symbol}.')
+                  .format(cl_name=self.name, state=from_state,
+                          symbol=symbol))
+        elif self.mealy:
+            pr_out_symbol = 'ℇ' if output == '' else output
+            print('\t({from_.name}, {symbol}, {out_symbol}) -> {to_.name}'
+                  .format(from_=from_state, symbol=symbol,
+                          out_symbol=pr_out_symbol, to_=to_state))
+            self.output.append(output)
+        else:
+            print('\t({from_.name}, {symbol}) -> {to_.name}'
+                  .format(from_=from_state, symbol=symbol, to_=to_state))
+
+    def end(self, state, accepted):
+        if self.mealy:
+            print('\tOutput: ' + ''.join(self.output))
+        if accepted:
+            print('\tAccept')
+        else:
+            print('\tReject', end='\t')
+            print(('\tState "{state.name}" is not an accept state.'
+                   if self.mealy else
+                   '\tState {state.name} is not an accept state.')
+                  .format(state=state))
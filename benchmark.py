@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""Throughput and scaling benchmarks for the automaton engines.
+
+    python benchmark.py --output after.json --baseline before.json
+
+Every result is a number keyed by name; names ending in `_per_sec` are
+rates (higher is better), names ending in `_sec` are wall times and names
+ending in `_bytes` are memory sizes (both lower is better). With
+--baseline, any result worse than the baseline by more than --tolerance
+fails the run.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from automata import dataset
+from automata.dfa import DFA, MealyMachine
+
+
+def random_dfa(n_states, alphabet, density=1.0, seed=None, cls=DFA):
+    """DFA with `n_states` states q_0 .. q_{n - 1} and random transitions.
+
+    Each state gets a transition on each symbol with probability
+    `density`; about a third of the states accept.
+    """
+    rnd = random.Random(seed)
+    dfa = cls(list(alphabet))
+    for i in range(n_states):
+        dfa.add_state(initial=i == 0, accept=rnd.random() < 0.3)
+    for i in range(n_states):
+        for s in alphabet:
+            if rnd.random() < density:
+                dfa.add_transition('q_{}'.format(i),
+                                   'q_{}'.format(rnd.randrange(n_states)), s)
+    return dfa
+
+
+def random_mealy(n_states, alphabet, out_alphabet, density=1.0, seed=None):
+    """MealyMachine like random_dfa, each transition writing 0 to 2
+    symbols of `out_alphabet`."""
+    rnd = random.Random(seed)
+    machine = MealyMachine(list(alphabet), list(out_alphabet))
+    for i in range(n_states):
+        machine.add_state(initial=i == 0, accept=rnd.random() < 0.3)
+    for i in range(n_states):
+        for s in alphabet:
+            if rnd.random() < density:
+                out = ''.join(rnd.choice(out_alphabet)
+                              for _ in range(rnd.randrange(3)))
+                machine.add_transition('q_{}'.format(i),
+                                       'q_{}'.format(rnd.randrange(n_states)),
+                                       s, out)
+    return machine
+
+
+def best_time(func, repeat=3):
+    """Shortest of `repeat` wall times of func()."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _text(alphabet, length, seed):
+    rnd = random.Random(seed)
+    return ''.join(rnd.choice(alphabet) for _ in range(length))
+
+
+def bench_process_sequence(results, n_states=1000, alphabet='ab',
+                           length=200000):
+    dfa = random_dfa(n_states, alphabet, seed=1)
+    text = _text(alphabet, length, 2)
+    results['dfa_process_sequence_symbols_per_sec'] = length / best_time(
+        lambda: dfa.process_sequence(text, verbose=False))
+    dfa.compile()
+    results['dfa_accepts_symbols_per_sec'] = length / best_time(
+        lambda: dfa.accepts(text))
+    batch = [_text(alphabet, 100, i) for i in range(2000)]
+    results['dfa_accepts_batch_symbols_per_sec'] = 100 * 2000 / best_time(
+        lambda: dfa.accepts_batch(batch))
+
+    machine = random_mealy(n_states, alphabet, 'xy', seed=1)
+    short = text[:length // 10]
+    with contextlib.redirect_stdout(io.StringIO()):
+        elapsed = best_time(lambda: machine.process_sequence(short), 1)
+    results['mealy_process_sequence_symbols_per_sec'] = len(short) / elapsed
+    machine.compile()
+    results['mealy_transduce_symbols_per_sec'] = length / best_time(
+        lambda: machine.transduce(text))
+
+
+def bench_minimize(results, sizes=(100, 1000, 10000), pairs_sizes=(10, 20, 40),
+                   alphabet='ab'):
+    """minimize() wall time by state count, for both methods.
+
+    The pairs method is much slower and fails on some random automata, so
+    it gets smaller sizes and skips the seeds it fails on.
+    """
+    for n in sizes:
+        dfas = [random_dfa(n, alphabet, seed=n) for _ in range(3)]
+        results['minimize_hopcroft_{}_states_sec'.format(n)] = best_time(
+            lambda: dfas.pop().minimize(method='hopcroft'))
+    for n in pairs_sizes:
+        times = []
+        for seed in range(n, n + 20):
+            dfa = random_dfa(n, alphabet, seed=seed)
+            start = time.perf_counter()
+            try:
+                dfa.minimize(method='pairs')
+            except ValueError:
+                continue
+            times.append(time.perf_counter() - start)
+            if len(times) == 3:
+                break
+        if times:
+            results['minimize_pairs_{}_states_sec'.format(n)] = min(times)
+
+
+def bench_construction(results, n_states=20000, alphabet='abcd'):
+    dfa = DFA(list(alphabet))
+    start = time.perf_counter()
+    for i in range(n_states):
+        dfa.add_state(initial=i == 0)
+    results['add_state_per_sec'] = n_states / (time.perf_counter() - start)
+    rnd = random.Random(3)
+    edges = [('q_{}'.format(i), 'q_{}'.format(rnd.randrange(n_states)), s)
+             for i in range(n_states) for s in alphabet]
+    start = time.perf_counter()
+    for from_, to_, s in edges:
+        dfa.add_transition(from_, to_, s)
+    results['add_transition_per_sec'] = len(edges) / (time.perf_counter()
+                                                      - start)
+    results['from_edges_per_sec'] = len(edges) / best_time(
+        lambda: DFA.from_edges(list(alphabet), [s.name for s in dfa.states],
+                               edges, initial='q_0'))
+
+
+def bench_memory(results, n_states=100000, alphabet='ab'):
+    """Memory held by a DFA per state, built both ways."""
+    rnd = random.Random(7)
+    table = [[rnd.randrange(n_states) for _ in alphabet]
+             for _ in range(n_states)]
+    tracemalloc.start()
+    dfa = DFA.from_table(list(alphabet), table, accept=[0])
+    results['from_table_per_state_bytes'] = (
+        tracemalloc.get_traced_memory()[0] / n_states)
+    tracemalloc.stop()
+    del dfa
+    tracemalloc.start()
+    dfa = DFA(list(alphabet))
+    for i in range(n_states):
+        dfa.add_state(initial=i == 0, accept=i == 0)
+    for i, row in enumerate(table):
+        for s, j in zip(alphabet, row):
+            dfa.add_transition('q_{}'.format(i), 'q_{}'.format(j), s)
+    results['add_transition_per_state_bytes'] = (
+        tracemalloc.get_traced_memory()[0] / n_states)
+    tracemalloc.stop()
+
+
+def bench_gen_dataset(results, fname=None, n_nodes=4039, n_edges=88234,
+                      workers=None):
+    """Classification rate of gen_dataset on `fname`, or on a random graph
+    of the SNAP Facebook size."""
+    path = fname
+    if path is None:
+        rng = np.random.default_rng(4)
+        u = rng.integers(n_nodes, size=n_edges)
+        v = rng.integers(n_nodes, size=n_edges)
+        edges = np.stack([np.minimum(u, v), np.maximum(u, v)], axis=1)
+        edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            np.savetxt(f, edges, fmt='%d')
+    try:
+        start = time.perf_counter()
+        graph = dataset.load_edges(path)
+        results['load_edges_sec'] = time.perf_counter() - start
+        genuine = dataset.genuine_mask(len(graph), rng=5)
+        start = time.perf_counter()
+        counts = dataset.classify_dataset(
+            graph, dataset.FacebookIPR(), genuine, workers=workers,
+            seed=6)
+        elapsed = time.perf_counter() - start
+    finally:
+        if fname is None:
+            os.remove(path)
+    results['gen_dataset_profiles_per_sec'] = len(graph.sources()) / elapsed
+    results['gen_dataset_patterns_per_sec'] = len(counts[4]) / elapsed
+
+
+BENCHMARKS = {
+    'process_sequence': bench_process_sequence,
+    'minimize': bench_minimize,
+    'construction': bench_construction,
+    'memory': bench_memory,
+    'gen_dataset': bench_gen_dataset,
+}
+
+
+def regressions(results, baseline, tolerance):
+    """Results worse than `baseline` by more than `tolerance` (a fraction),
+    as (name, baseline value, new value) triples."""
+    worse = []
+    for name, old in sorted(baseline.items()):
+        new = results.get(name)
+        if new is None:
+            continue
+        if name.endswith('_per_sec'):
+            if new < old * (1 - tolerance):
+                worse.append((name, old, new))
+        elif name.endswith(('_sec', '_bytes')):
+            if new > old * (1 + tolerance):
+                worse.append((name, old, new))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', help='write the results to this JSON '
+                        'file')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown against the baseline, as a '
+                        'fraction (default 0.25)')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help='run only these benchmarks')
+    parser.add_argument('--edges', help='edge list for the gen_dataset '
+                        'benchmark instead of a random graph')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or sorted(BENCHMARKS):
+        print('Running {}...'.format(name), file=sys.stderr)
+        if name == 'gen_dataset':
+            bench_gen_dataset(results, fname=args.edges)
+        else:
+            BENCHMARKS[name](results)
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        worse = regressions(results, baseline, args.tolerance)
+        for name, old, new in worse:
+            print('REGRESSION {0}: {1:.4g} -> {2:.4g}'.format(name, old, new),
+                  file=sys.stderr)
+        if worse:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())